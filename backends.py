@@ -0,0 +1,172 @@
+import io
+
+import pdfplumber
+
+from config import TEXT_LAYER_GAP, TEXT_LAYER_MIN_CHARS
+from debug_sink import debug_sink
+from ocr_lines import Line
+from utils import iter_pdf_pages
+
+
+# Extraction backends turn PDF bytes into the {"pages": [...]} structure the
+# chain parsers read: page_number, lines (ocr_lines.Line records), key_value_pairs and
+# tables (cells with row_index/column_index/content).
+
+
+class ExtractionBackend:
+    name = None
+
+    def iter_pages(self, pdf_bytes, job_id=None):
+        raise NotImplementedError
+
+    def extract(self, pdf_bytes, job_id=None):
+        return {"pages": list(self.iter_pages(pdf_bytes, job_id=job_id))}
+
+
+class AzureBackend(ExtractionBackend):
+    # Azure Form Recognizer prebuilt-document, with the OCR cache and page chunking
+    name = "azure"
+
+    def __init__(self, ocr_client=None):
+        self.ocr_client = ocr_client
+
+    def iter_pages(self, pdf_bytes, job_id=None):
+        return iter_pdf_pages(pdf_bytes, ocr_client=self.ocr_client, job_id=job_id)
+
+
+def _split_row(words, gap):
+    # Azure reports each table cell / text run as its own line. Mimic that by
+    # cutting a visual row wherever the horizontal gap between words is wide.
+    segments = []
+    current = [words[0]]
+    for word in words[1:]:
+        if word["x0"] - current[-1]["x1"] > gap:
+            segments.append(current)
+            current = [word]
+        else:
+            current.append(word)
+    segments.append(current)
+    return [
+        Line(" ".join(word["text"] for word in segment),
+             (segment[0]["x0"], min(word["top"] for word in segment), segment[-1]["x1"], max(word["bottom"] for word in segment)))
+        for segment in segments
+    ]
+
+
+def text_layer_lines(page, gap=TEXT_LAYER_GAP):
+    words = page.extract_words(keep_blank_chars=False, use_text_flow=False)
+    rows = []
+    for word in sorted(words, key=lambda w: (round(w["top"]), w["x0"])):
+        # Words whose tops are within 3pt belong to the same visual row
+        if rows and abs(word["top"] - rows[-1][0]) <= 3:
+            rows[-1][1].append(word)
+        else:
+            rows.append((word["top"], [word]))
+
+    lines = []
+    for _, row_words in rows:
+        row_words.sort(key=lambda w: w["x0"])
+        lines.extend(_split_row(row_words, gap))
+    return tuple(lines)
+
+
+def text_layer_tables(page):
+    tables = []
+    for table in page.extract_tables():
+        cells = []
+        for row_index, row in enumerate(table):
+            for column_index, content in enumerate(row):
+                if content is None:
+                    continue
+                cells.append({"row_index": row_index, "column_index": column_index, "content": content})
+        tables.append(cells)
+    return tables
+
+
+def text_layer_page(page):
+    return {
+        "page_number": page.page_number,
+        "lines": text_layer_lines(page),
+        "key_value_pairs": [],
+        "tables": text_layer_tables(page),
+    }
+
+
+def has_text_layer(page, min_chars=TEXT_LAYER_MIN_CHARS):
+    return len(page.chars) >= min_chars
+
+
+class TextLayerBackend(ExtractionBackend):
+    # Reads the embedded text of digitally generated PDFs; never calls the cloud.
+    # Scanned pages come back with no lines.
+    name = "text"
+
+    def iter_pages(self, pdf_bytes, job_id=None):
+        # Pages are only kept when the debug sink wants the whole document, as for Azure
+        keep_pages = debug_sink.enabled
+        kept_pages = []
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            for page in pdf.pages:
+                page_data = text_layer_page(page)
+                if keep_pages:
+                    kept_pages.append(page_data)
+                yield page_data
+                page.flush_cache()
+        if keep_pages:
+            debug_sink.write(job_id, {"pages": kept_pages})
+
+
+class HybridBackend(ExtractionBackend):
+    # Text layer where the PDF has one; only scanned pages are sent to Azure
+    name = "hybrid"
+
+    def __init__(self, ocr_client=None):
+        self.ocr_client = ocr_client
+
+    def iter_pages(self, pdf_bytes, job_id=None):
+        try:
+            pdf = pdfplumber.open(io.BytesIO(pdf_bytes))
+        except Exception:
+            # Not something pdfplumber can read: Azure gets the whole document
+            yield from iter_pdf_pages(pdf_bytes, ocr_client=self.ocr_client, job_id=job_id)
+            return
+
+        with pdf:
+            local_pages = {}
+            scanned = []
+            for page in pdf.pages:
+                if has_text_layer(page):
+                    local_pages[page.page_number] = text_layer_page(page)
+                else:
+                    scanned.append(page.page_number)
+                page.flush_cache()
+
+        if not scanned:
+            pages = [local_pages[number] for number in sorted(local_pages)]
+            debug_sink.write(job_id, {"pages": pages})
+            yield from pages
+            return
+
+        # iter_analyze_results splits the selection into OCR_CHUNK_PAGES calls analyzed concurrently
+        ocr_pages = iter_pdf_pages(
+            pdf_bytes, ocr_client=self.ocr_client, job_id=job_id, pages=",".join(str(number) for number in scanned)
+        )
+        ocr_pages = {page["page_number"]: page for page in ocr_pages}
+        for number in sorted(set(local_pages) | set(ocr_pages)):
+            yield local_pages.get(number) or ocr_pages[number]
+
+
+BACKENDS = {
+    AzureBackend.name: AzureBackend,
+    TextLayerBackend.name: TextLayerBackend,
+    HybridBackend.name: HybridBackend,
+}
+
+
+def get_backend(name, ocr_client=None):
+    if name not in BACKENDS:
+        raise ValueError("Unknown extraction backend: %s" % name)
+    backend_class = BACKENDS[name]
+    if backend_class is TextLayerBackend:
+        return backend_class()
+    return backend_class(ocr_client=ocr_client)
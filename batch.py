@@ -0,0 +1,122 @@
+import contextvars
+import io
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from streaming import outlet_records
+from utils import process_document
+
+
+class BatchTooLargeError(Exception):
+    pass
+
+
+## Uploads----------------------------------------------------------------------------------------------------------------------------------------
+
+def is_pdf_name(name):
+    return name.lower().endswith(".pdf")
+
+def expand_uploads(uploads, max_files=None, max_unzipped_bytes=None):
+    # uploads is a list of (file_name, bytes); zip archives are replaced by the
+    # PDFs they contain, named "<archive>/<member>" so results can be traced back.
+    # Unpacked sizes are checked from the zip headers before anything is read;
+    # zipfile never returns more than a member's declared file_size.
+    documents = []
+    unzipped_bytes = 0
+    for file_name, data in uploads:
+        if file_name.lower().endswith(".zip") or zipfile.is_zipfile(io.BytesIO(data)):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.infolist():
+                    if member.is_dir() or member.filename.startswith("__MACOSX/") or not is_pdf_name(member.filename):
+                        continue
+                    unzipped_bytes += member.file_size
+                    if max_unzipped_bytes is not None and unzipped_bytes > max_unzipped_bytes:
+                        raise BatchTooLargeError(f"Zip archives may unpack to at most {max_unzipped_bytes} bytes")
+                    documents.append((f"{file_name}/{member.filename}", archive.read(member)))
+        else:
+            documents.append((file_name, data))
+        if max_files is not None and len(documents) > max_files:
+            raise BatchTooLargeError(f"A batch may contain at most {max_files} PDFs")
+    return documents
+
+
+## Aggregation------------------------------------------------------------------------------------------------------------------------------------
+
+def outlet_rows(output_data, file_name):
+    # One row per outlet: every scalar field of the parser's outlet record plus
+    # the source file and product count; the product lists stay in the per-file results
+    rows = []
+    for outlet in outlet_records(output_data):
+        row = {"File": file_name}
+        row.update((key, value) for key, value in outlet.items() if key != "Products")
+        if "Products" in outlet:
+            row["Product Count"] = len(outlet["Products"])
+        rows.append(row)
+    return rows
+
+
+## Batch run--------------------------------------------------------------------------------------------------------------------------------------
+
+def run_batch(documents, get_product_dimensions, backend, ocr_workers=4, parse_pool=None):
+    """Extract and parse a list of (file_name, pdf_bytes) documents.
+
+    OCR runs on a bounded thread pool; each document is parsed as soon as
+    its extraction finishes. The dimension table is loaded on first use and
+    that snapshot is shared by every file of the batch. A failure, including
+    a catalog that cannot be loaded, only affects its own file entry.
+
+    With a shared, already warm ParsePool (see parse_pool.py) parsing runs
+    in its worker processes, each against its own copy of the dimension
+    table loaded by path.
+    """
+    results = [{"file_name": file_name, "status": "queued", "result": None, "error": None}
+               for file_name, _ in documents]
+    if not documents:
+        return {"files": results, "outlets": [], "succeeded": 0, "failed": 0}
+
+    if parse_pool is not None:
+        def parse(extracted_data, file_name):
+            return parse_pool.parse(extracted_data, file_name)
+    else:
+        snapshot = []
+        snapshot_lock = threading.Lock()
+
+        def batch_product_dimensions():
+            # Summary-only batches never touch the table; a failed load is retried by the next file
+            with snapshot_lock:
+                if not snapshot:
+                    snapshot.append(get_product_dimensions())
+                return snapshot[0]
+
+        def parse(extracted_data, file_name):
+            return process_document(extracted_data, file_name, batch_product_dimensions)
+
+    def extract_and_parse(index):
+        file_name, pdf_bytes = documents[index]
+        entry = results[index]
+        entry["status"] = "running"
+        try:
+            extracted_data = backend.extract(pdf_bytes)
+        except Exception as e:
+            entry.update(status="failed", stage="ocr", error=str(e))
+            return
+        try:
+            entry["result"] = parse(extracted_data, file_name)
+            entry["status"] = "succeeded"
+        except Exception as e:
+            entry.update(status="failed", stage="parse", error=str(e))
+
+    with ThreadPoolExecutor(max_workers=max(1, ocr_workers), thread_name_prefix="po-batch") as ocr_pool:
+        # One context copy per task; a single Context cannot be entered by two threads at once
+        futures = [ocr_pool.submit(contextvars.copy_context().run, extract_and_parse, index)
+                   for index in range(len(documents))]
+        for future in futures:
+            future.result()
+
+    outlets = []
+    for entry in results:
+        if entry["status"] == "succeeded":
+            outlets.extend(outlet_rows(entry["result"], entry["file_name"]))
+    succeeded = sum(1 for entry in results if entry["status"] == "succeeded")
+    return {"files": results, "outlets": outlets, "succeeded": succeeded, "failed": len(results) - succeeded}
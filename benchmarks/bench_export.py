@@ -0,0 +1,67 @@
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import export, export_rows, product_rows
+
+# Peak memory and time to turn a parsed PO into an outlet x product sheet:
+# pandas DataFrame + to_excel (the old create_excel route) against the
+# constant-memory xlsxwriter and streamed CSV writers in export.py.
+# Run: python benchmarks/bench_export.py [outlets] [products_per_outlet]
+
+
+def make_output(outlets, products):
+    return [{
+        "Outlet Code": str(1000 + o),
+        "Outlet Name": f"Outlet {o}",
+        "Total Sales": 1000.0 + o,
+        "Products": [{"Product Code": f"CF{o:04d}{p:04d}", "Product Name": f"Product {p}",
+                      "Quantity": float(p % 50), "Volume": p * 0.25} for p in range(products)],
+    } for o in range(outlets)]
+
+
+def pandas_xlsx(output_data):
+    buffer = io.BytesIO()
+    pd.DataFrame(list(product_rows(output_data))).to_excel(buffer, index=False)
+    return buffer.getbuffer().nbytes
+
+
+def streamed(fmt):
+    def run(output_data):
+        body, _, _ = export(export_rows(output_data), fmt)
+        if fmt == "csv":
+            return sum(len(chunk) for chunk in body)
+        return body.getbuffer().nbytes
+    return run
+
+
+def measure(write, output_data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = write(output_data)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, size
+
+
+def main():
+    outlets = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    products = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    output_data = make_output(outlets, products)
+    print(f"{outlets} outlets x {products} products = {outlets * products} rows")
+    print("%-16s %10s %12s %12s" % ("writer", "seconds", "peak MB", "output KB"))
+    for name, write in (("pandas to_excel", pandas_xlsx), ("xlsx streamed", streamed("xlsx")),
+                        ("csv streamed", streamed("csv"))):
+        seconds, peak, size = measure(write, output_data)
+        print("%-16s %10.2f %12.1f %12.0f" % (name, seconds, peak / 1e6, size / 1e3))
+
+
+if __name__ == "__main__":
+    main()
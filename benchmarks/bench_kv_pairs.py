@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_ocr import build_analyze_result
+from ocr_lines import to_serializable
+from utils import analyze_result_to_dict
+
+# Size/memory regression check for key-value pairs in extraction results.
+# Before the fix every page carried every document-level pair, so output grew
+# as pages x pairs. Run: python benchmarks/bench_kv_pairs.py [pages] [pairs_per_page]
+
+
+def synthetic_result_dict(page_count, pairs_per_page, lines_per_page=120):
+    return {"pages": [
+        {
+            "page_number": number,
+            "lines": [{"text": "line %d of page %d" % (i, number)} for i in range(lines_per_page)],
+            "tables": [],
+            "key_value_pairs": [
+                {"key": "Field %d" % i, "value": "Value %d on page %d" % (i, number)} for i in range(pairs_per_page)
+            ],
+        }
+        for number in range(1, page_count + 1)
+    ]}
+
+
+def legacy_result_to_dict(result):
+    # The old conversion: all document pairs copied onto each page
+    result_dict = {"pages": []}
+    for page in result.pages:
+        page_data = {"page_number": page.page_number, "lines": [], "key_value_pairs": [], "tables": []}
+        for line in page.lines:
+            page_data["lines"].append({"text": line.content})
+        for kvp in result.key_value_pairs:
+            page_data["key_value_pairs"].append({
+                "key": kvp.key.content if kvp.key else None,
+                "value": kvp.value.content if kvp.value else None,
+            })
+        result_dict["pages"].append(page_data)
+    return result_dict
+
+
+def measure(convert, result):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result_dict = convert(result)
+    convert_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    payload = json.dumps(result_dict, default=to_serializable)
+    dump_seconds = time.perf_counter() - start
+    pairs = sum(len(page["key_value_pairs"]) for page in result_dict["pages"])
+    return {
+        "pairs": pairs,
+        "json_bytes": len(payload),
+        "peak_kib": peak // 1024,
+        "convert_ms": round(convert_seconds * 1000, 1),
+        "json_ms": round(dump_seconds * 1000, 1),
+    }
+
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    pairs_per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    result = build_analyze_result(synthetic_result_dict(page_count, pairs_per_page))
+    total_pairs = page_count * pairs_per_page
+
+    legacy = measure(legacy_result_to_dict, result)
+    current = measure(analyze_result_to_dict, result)
+    print("%d pages, %d key-value pairs" % (page_count, total_pairs))
+    for name, stats in (("legacy", legacy), ("current", current)):
+        print("%-8s %s" % (name, "  ".join("%s=%s" % item for item in stats.items())))
+
+    # Regression guard: each pair appears exactly once
+    assert current["pairs"] == total_pairs, current["pairs"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures
+from benchmarks.bench_parsers import PARSERS, line_count
+from ocr_lines import compact_page
+
+# Memory per page and parse time for lines stored as {"text": ...} dicts
+# versus ocr_lines.Line records (what the extractors produce now).
+# Run: python benchmarks/bench_lines.py [scale] [repeat]
+
+
+def traced_size(build):
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def best_time(parse, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("%-14s %7s %12s %12s %10s %10s" % ("chain", "lines", "dict B/line", "Line B/line", "dict ms", "Line ms"))
+    for name, (parse, sizes) in PARSERS.items():
+        make = fixtures.FIXTURES[name]
+        kwargs = {key: value * scale for key, value in sizes.items()}
+        dict_data, dict_bytes = traced_size(lambda: make(**kwargs))
+        line_data, line_bytes = traced_size(lambda: {"pages": [compact_page(page) for page in make(**kwargs)["pages"]]})
+        lines = line_count(dict_data)
+        print("%-14s %7d %12.0f %12.0f %10.2f %10.2f" % (
+            name, lines, dict_bytes / lines, line_bytes / lines,
+            best_time(parse, dict_data, repeat) * 1000, best_time(parse, line_data, repeat) * 1000))
+
+
+if __name__ == "__main__":
+    main()
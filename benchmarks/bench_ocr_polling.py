@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_ocr import FakeFormRecognizerTransport
+from ocr_client import AsyncOcrClient
+
+# Time between an analysis finishing on the (fake) service and the client
+# seeing it, for the SDK's fixed 1s polling against AdaptivePolling, and how
+# many analyses one event loop keeps in flight.
+# Run: python benchmarks/bench_ocr_polling.py [concurrent]
+
+TINY = {"pages": [{"page_number": 1, "lines": [{"text": "PO"}]}]}
+LATENCIES = (0.3, 0.6, 0.9, 1.4, 2.2, 3.5)
+
+
+def wait_for(client, latency):
+    start = time.perf_counter()
+    client.begin_analyze_document("prebuilt-document", b"%PDF").result()
+    return time.perf_counter() - start - latency
+
+
+def main():
+    concurrent = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    print("%-10s %-10s %12s %8s" % ("polling", "latency", "overshoot s", "polls"))
+    for label, options in (("fixed 1s", {"poll_initial": 1.0, "poll_backoff": 1.0, "poll_max": 1.0}), ("adaptive", {})):
+        for latency in LATENCIES:
+            transport = FakeFormRecognizerTransport(TINY, latency=latency)
+            client = AsyncOcrClient("https://fake.local", "key", transport=transport, **options)
+            overshoot = wait_for(client, latency)
+            client.close()
+            print("%-10s %-10.1f %12.2f %8d" % (label, latency, overshoot, transport.polls))
+
+    transport = FakeFormRecognizerTransport(TINY, latency=1.0)
+    client = AsyncOcrClient("https://fake.local", "key", transport=transport, max_in_flight=concurrent)
+    start = time.perf_counter()
+    pollers = [client.begin_analyze_document("prebuilt-document", b"%PDF") for _ in range(concurrent)]
+    for poller in pollers:
+        poller.result()
+    print("%d concurrent 1s analyses on one loop: %.2fs" % (concurrent, time.perf_counter() - start))
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks import fixtures
+from benchmarks.bench_parsers import PARSERS
+from catalog import get_catalog
+from parse_pool import ParsePool
+from utils import process_document
+
+# Parse throughput (documents/s) in-process, on threads and on ParsePool with
+# 1..cpu_count workers. Threads show the GIL ceiling; the pool should scale
+# with cores. Documents are replayed from recorded extracted_data JSON files
+# (e.g. debug dumps) when a directory is given, otherwise synthetic fixtures.
+# Run: python benchmarks/bench_parse_pool.py [documents] [recorded_dir]
+
+
+def write_dimension_table(path):
+    pd.DataFrame({
+        "item": fixtures.PRODUCTS,
+        "height": [10 + index for index in range(len(fixtures.PRODUCTS))],
+        "width": 5,
+        "length": 4,
+        "per box": 12,
+    }).to_excel(path, index=False)
+
+
+def load_documents(count, recorded_dir=None):
+    if recorded_dir:
+        recorded = []
+        for path in sorted(glob.glob(os.path.join(recorded_dir, "*.json"))):
+            with open(path, encoding="utf-8") as f:
+                recorded.append((os.path.basename(path), json.load(f)))
+        if not recorded:
+            sys.exit("No *.json files in %s" % recorded_dir)
+    else:
+        # Same per-chain document sizes as bench_parsers.py
+        recorded = [("%s.pdf" % name, fixtures.FIXTURES[name](**sizes)) for name, (_, sizes) in PARSERS.items()]
+    return [recorded[index % len(recorded)] for index in range(count)]
+
+
+def timed(label, run, documents, baseline=None):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    rate = len(documents) / elapsed
+    speedup = " %5.2fx" % (rate / baseline) if baseline else ""
+    print("%-18s %8.2f s  %8.1f docs/s%s" % (label, elapsed, rate, speedup))
+    return rate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    recorded_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    documents = load_documents(count, recorded_dir)
+    cores = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        table_path = os.path.join(directory, "dimensions.xlsx")
+        write_dimension_table(table_path)
+        get_product_dimensions = get_catalog(table_path).snapshot
+        get_product_dimensions()
+
+        def parse_one(document):
+            return process_document(document[1], document[0], get_product_dimensions)
+
+        baseline = timed("in-process", lambda: [parse_one(document) for document in documents], documents)
+
+        with ThreadPoolExecutor(max_workers=cores) as threads:
+            timed("threads x%d" % cores, lambda: list(threads.map(parse_one, documents)), documents, baseline)
+
+        workers = 1
+        while True:
+            pool = ParsePool(workers, table_path)
+            try:
+                pool.warm()
+                timed("pool x%d" % workers, lambda: [future.result() for future in
+                                                     [pool.submit(data, name) for name, data in documents]],
+                      documents, baseline)
+            finally:
+                pool.shutdown()
+            if workers >= cores:
+                break
+            workers = min(workers * 2, cores)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures
+from utils import (process_Arpico_data, process_cargils_data, process_country_style_data, process_Laugfs_data,
+                   process_other_data, process_Softlogic_data, process_summary_order_data)
+
+# Lines/sec per chain parser over the synthetic OCR fixtures.
+# Run: python benchmarks/bench_parsers.py [scale] [repeat]
+
+PRODUCT_DIMENSIONS = {
+    name.lower(): {"Item Name": name.lower(), "VolumePerUnit": float(index + 1)}
+    for index, name in enumerate(fixtures.PRODUCTS)
+}
+
+PARSERS = {
+    "cargills": (lambda data: process_cargils_data(data, PRODUCT_DIMENSIONS), {"outlets": 40}),
+    "country_style": (lambda data: process_country_style_data(data, PRODUCT_DIMENSIONS), {"products": 300}),
+    "softlogic": (lambda data: process_Softlogic_data(data, PRODUCT_DIMENSIONS), {"outlets": 40}),
+    "laugfs": (lambda data: process_Laugfs_data(data, PRODUCT_DIMENSIONS), {"outlets": 40}),
+    "arpico": (lambda data: process_Arpico_data(data, PRODUCT_DIMENSIONS), {"outlets": 40}),
+    "summary": (process_summary_order_data, {"outlets": 400}),
+    "other": (lambda data: process_other_data(data, PRODUCT_DIMENSIONS), {"products": 300}),
+}
+
+
+def line_count(data):
+    return sum(len(page["lines"]) for page in data["pages"])
+
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    for name, (parse, sizes) in PARSERS.items():
+        data = fixtures.FIXTURES[name](**{key: value * scale for key, value in sizes.items()})
+        lines = line_count(data)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse(data)
+            best = min(best, time.perf_counter() - start)
+        print("%-14s %7d lines  %8.2f ms  %10.0f lines/s" % (name, lines, best * 1000, lines / best))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures
+from benchmarks.bench_parsers import PARSERS
+from ocr_lines import json_bytes
+from responses import brotli, columnar, compress
+from updated_app import app
+
+# Encode time and payload size of an /upload answer: Flask jsonify (the old
+# path) against orjson, orjson + gzip/brotli, and the ?shape=columnar payload.
+# Run: python benchmarks/bench_responses.py [scale] [repeat]
+
+
+def best_time(encode, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode()
+        best = min(best, time.perf_counter() - start)
+    return best, len(body)
+
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("%-14s %-18s %10s %10s" % ("chain", "encoding", "ms", "KB"))
+    for name in ("country_style", "other", "cargills"):
+        parse, sizes = PARSERS[name]
+        output_data = parse(fixtures.FIXTURES[name](**{key: value * scale for key, value in sizes.items()}))
+        encoders = [
+            ("jsonify", lambda: app.json.dumps(output_data).encode("utf-8")),
+            ("orjson", lambda: json_bytes(output_data)),
+            ("orjson+gzip", lambda: compress(json_bytes(output_data), "gzip")),
+        ]
+        if brotli is not None:
+            encoders.append(("orjson+br", lambda: compress(json_bytes(output_data), "br")))
+        encoders += [
+            ("columnar", lambda: json_bytes(columnar(output_data))),
+            ("columnar+gzip", lambda: compress(json_bytes(columnar(output_data)), "gzip")),
+        ]
+        for label, encode in encoders:
+            seconds, size = best_time(encode, repeat)
+            print("%-14s %-18s %10.2f %10.1f" % (name, label, seconds * 1000, size / 1e3))
+
+
+if __name__ == "__main__":
+    main()
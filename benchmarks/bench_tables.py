@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures
+from benchmarks.bench_parsers import PARSERS, line_count
+
+# Line-offset parsing versus the table-driven path (table_rows.py) on the same
+# synthetic POs, with and without the OCR table cells attached. Also counts the
+# products each path returns: rows broken over a page end are lost by the
+# offset path but kept by the table path.
+# Run: python benchmarks/bench_tables.py [scale] [repeat]
+
+CHAINS = ("cargills", "country_style", "softlogic", "laugfs", "arpico")
+
+
+def product_count(output):
+    return sum(len(outlet.get("Products", [])) for outlet in output)
+
+
+def best_time(parse, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = parse(data)
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("%-14s %7s %10s %10s %10s %10s" % ("chain", "lines", "lines ms", "tables ms", "products", "w/ tables"))
+    for name in CHAINS:
+        parse, sizes = PARSERS[name]
+        kwargs = {key: value * scale for key, value in sizes.items()}
+        plain = fixtures.FIXTURES[name](**kwargs)
+        with_tables = fixtures.FIXTURES[name](tables=True, **kwargs)
+        line_time, line_output = best_time(parse, plain, repeat)
+        table_time, table_output = best_time(parse, with_tables, repeat)
+        print("%-14s %7d %10.2f %10.2f %10d %10d" % (
+            name, line_count(plain), line_time * 1000, table_time * 1000,
+            product_count(line_output), product_count(table_output)))
+
+
+if __name__ == "__main__":
+    main()
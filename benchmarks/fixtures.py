@@ -0,0 +1,192 @@
+import random
+
+# Synthetic OCR results in the layout each chain parser expects, i.e. what
+# extract_data_from_pdf returns for that supplier's PO. Generated with a fixed
+# seed so timings and outputs are repeatable. Scale with outlets/products.
+# tables=True also fills each page's "tables" with the order table cells, as
+# Azure returns them next to the lines.
+
+PRODUCTS = [
+    "Coca Cola 1L", "Sprite 500ml", "Fanta Orange 1.5L", "Milo 400g Pack", "Nestomalt 400g",
+    "Anchor Milk Powder 1kg", "Munchee Cream Cracker 490g", "Maliban Lemon Puff 200g",
+    "Sunlight Soap 110g", "Lux Soap 100g", "Signal Toothpaste 120g", "Keells Sausages 500g",
+    "Prima Noodles 400g", "Kotmale Yoghurt 80g", "Elephant House Ginger Beer 1.5L",
+    "Lipton Ceylonta Tea 200g", "Harischandra Coffee 50g", "Astra Margarine 250g",
+]
+
+TOWNS = ["Kandy", "Galle", "Matara", "Negombo", "Kurunegala", "Jaffna", "Badulla", "Ratnapura", "Anuradhapura", "Trincomalee"]
+
+
+def _doc(pages):
+    return {"pages": [
+        {"page_number": number, "lines": [{"text": text} for text in lines], "key_value_pairs": [], "tables": []}
+        for number, lines in enumerate(pages, start=1)
+    ]}
+
+
+def _table(header, rows):
+    # Cell list in the extractor's format; header=None for a table continued from the previous page
+    grid = ([header] if header else []) + rows
+    return [
+        {"row_index": r, "column_index": c, "content": content}
+        for r, row in enumerate(grid) for c, content in enumerate(row)
+    ]
+
+
+def _attach_tables(doc, page_tables):
+    for page, tables in zip(doc["pages"], page_tables):
+        page["tables"] = tables
+    return doc
+
+
+def _paginate(lines, per_page):
+    return [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+
+
+def _pick(rng, products):
+    return rng.sample(PRODUCTS, min(products, len(PRODUCTS)))
+
+
+def cargills(outlets=20, products=8, seed=1, outlets_per_page=1, noise=0.0, tables=False):
+    # noise is the share of product rows whose quantity OCR garbled, which
+    # sends the parser down its outlet-line recovery path
+    rng = random.Random(seed)
+    lines = []
+    rows = []
+    for o in range(outlets):
+        lines += ["Cargills (Ceylon) PLC", "Purchase Order", "%d EX %s" % (1000 + o, rng.choice(TOWNS))]
+        outlet_rows = []
+        for p, name in enumerate(_pick(rng, products)):
+            qty = "1 2" if rng.random() < noise else "%d.00" % rng.randint(1, 48)
+            row = [
+                "%s%04d" % (rng.choice(["CF", "CS", "FMC"]), 100 + p), name, "1 x 12", "EA",
+                qty, "{:,.2f}".format(rng.uniform(100, 9000)), "{:,.2f}".format(rng.uniform(10, 900)),
+            ]
+            lines += row
+            outlet_rows.append(row)
+        rows.append(outlet_rows)
+    per_page = len(lines) // max(1, outlets // outlets_per_page)
+    doc = _doc(_paginate(lines, per_page))
+    if tables:
+        header = ["Product Code", "Product Name", "Pack Size", "UOM", "Qty", "Net Value", "VAT"]
+        _attach_tables(doc, [
+            [_table(header, outlet_rows) for outlet_rows in rows[first:first + outlets_per_page]]
+            for first in range(0, outlets, outlets_per_page)
+        ])
+    return doc
+
+
+def country_style(outlets=6, products=30, seed=2, tables=False):
+    # One sheet, outlets are the fixed BG/KL/KW/NE/PL/TR columns
+    rng = random.Random(seed)
+    lines = ["PDK Country Style", "Purchase Order"]
+    rows_by_page = {}
+    for p in range(products):
+        row = ["%05d" % (10000 + p), rng.choice(PRODUCTS), "%d" % rng.randint(6, 24), "{:.2f}".format(rng.uniform(50, 900))]
+        row += ["%d" % rng.randint(0, 20) for _ in range(6)]
+        rows_by_page.setdefault(len(lines) // 400, []).append(row)
+        lines += row
+    doc = _doc(_paginate(lines, 400))
+    if tables:
+        # Only the first page repeats the header; later pages continue the table
+        header = ["Code", "Description", "C/S", "Price", "BG", "KL", "KW", "NE", "PL", "TR"]
+        _attach_tables(doc, [
+            [_table(header if index == 0 else None, rows_by_page.get(index, []))] if rows_by_page.get(index) else []
+            for index in range(len(doc["pages"]))
+        ])
+    return doc
+
+
+def softlogic(outlets=20, products=8, seed=3, tables=False):
+    rng = random.Random(seed)
+    pages = []
+    page_tables = []
+    for o in range(outlets):
+        lines = ["Softlogic Retail (Pvt) Ltd", "%05d" % (20000 + o), "Glomark %s" % rng.choice(TOWNS)]
+        rows = []
+        for p, name in enumerate(_pick(rng, products)):
+            row = [
+                "%06d" % (300000 + p), name, "{:.2f}".format(rng.uniform(50, 900)), "18", "PCS", "-", "EA",
+                "{:.2f}".format(rng.randint(1, 60)),
+            ]
+            lines += row
+            rows.append(row)
+        pages.append(lines)
+        page_tables.append([_table(["Item Code", "Description", "Price", "VAT", "UOM", "Free", "Unit", "Order in Quantity"], rows)])
+    doc = _doc(pages)
+    return _attach_tables(doc, page_tables) if tables else doc
+
+
+def laugfs(outlets=20, products=8, seed=4, tables=False):
+    rng = random.Random(seed)
+    pages = []
+    page_tables = []
+    for o in range(outlets):
+        lines = ["Laugfs Supermarkets (Pvt) Ltd", "Code", "Item Name", "Cost Price", "VAT Cost Price", "Quantity", TOWNS[o % len(TOWNS)]]
+        rows = []
+        for p, name in enumerate(_pick(rng, products)):
+            cost = rng.uniform(50, 900)
+            row = ["%07d" % (4000000 + p), name, "{:.2f}".format(cost), "-", "{:.2f}".format(cost * 1.18), "%d" % rng.randint(1, 60)]
+            lines += row
+            rows.append(row)
+        pages.append(lines)
+        page_tables.append([_table(["Code", "Item Name", "Cost Price", "Disc", "VAT Cost Price", "Quantity"], rows)])
+    doc = _doc(pages)
+    return _attach_tables(doc, page_tables) if tables else doc
+
+
+def arpico(outlets=20, products=8, seed=5, tables=False):
+    rng = random.Random(seed)
+    pages = []
+    page_tables = []
+    for o in range(outlets):
+        lines = ["Arpico Supercentre", "Supply", "%03d" % (100 + o), "%s SS" % rng.choice(TOWNS)]
+        rows = []
+        for p, name in enumerate(_pick(rng, products)):
+            row = [
+                "%08d %06d ABCD%06d" % (50000000 + p, 600000 + p, 700000 + p), name, "EA", "1",
+                "{:.2f}".format(rng.uniform(50, 900)), "0", "18", "%d" % rng.randint(1, 60),
+            ]
+            lines += row
+            order_no, plu, item_code = row[0].split()
+            rows.append([order_no, plu, item_code] + row[1:])
+        lines += ["Total", "{:.2f}".format(rng.uniform(10000, 90000))]
+        pages.append(lines)
+        page_tables.append([_table(["Order No", "PLU", "Item Code", "Description", "UOM", "Pack", "Rate", "Disc", "VAT", "Ordered"], rows)])
+    doc = _doc(pages)
+    return _attach_tables(doc, page_tables) if tables else doc
+
+
+def summary(outlets=200, seed=6):
+    rng = random.Random(seed)
+    lines = ["Cargills Summary Order Report"]
+    for o in range(outlets):
+        net = rng.uniform(1000, 90000)
+        lines += [
+            "%04d" % (1000 + o), "%s Food City" % rng.choice(TOWNS), "PO%06d" % o, "2024-05-01",
+            "{:,.2f}".format(net), "{:,.2f}".format(net * 0.18), "{:,.2f}".format(net * 1.18),
+        ]
+    return _doc(_paginate(lines, 350))
+
+
+def other(outlets=5, products=40, seed=7):
+    # Country-style order sheet: outlet short codes as column headers on each page
+    rng = random.Random(seed)
+    codes = ["COL", "KDY", "GAL", "MTR", "NEG"][:outlets]
+    lines = ["Country Style Foods:", "Order Sheet"] + codes
+    for p in range(products):
+        lines += ["*%d" % (500 + p), rng.choice(PRODUCTS), "{:,.2f}".format(rng.uniform(50, 900)), "%d" % rng.choice([6, 12, 24])]
+        for _ in codes:
+            lines += ["%d" % rng.randint(0, 5), "cs"]
+    return _doc([lines])
+
+
+FIXTURES = {
+    "cargills": cargills,
+    "country_style": country_style,
+    "softlogic": softlogic,
+    "laugfs": laugfs,
+    "arpico": arpico,
+    "summary": summary,
+    "other": other,
+}
@@ -0,0 +1,179 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from benchmarks import fixtures
+from benchmarks.bench_parsers import PRODUCT_DIMENSIONS, line_count
+from utils import (process_Arpico_data, process_cargils_data, process_country_style_data, process_Laugfs_data,
+                   process_other_data, process_Softlogic_data, process_summary_order_data)
+
+# Offline replay + regression harness for the chain parsers; no Azure calls.
+#
+# Each chain replays the recorded extracted_data JSON files in
+# benchmarks/recorded/<chain>/*.json (e.g. debug dumps of real POs) when
+# present, otherwise seeded synthetic documents. Reports lines/s, per-document
+# latency percentiles and peak traced memory, and compares every output with
+# benchmarks/golden/<chain>.json.
+#
+#   python benchmarks/replay.py                    # replay + golden check, exit 1 on mismatch
+#   python benchmarks/replay.py --update-golden    # accept current outputs
+#   python benchmarks/replay.py --stress 5000      # one synthetic document per chain with 5000 outlets
+
+CHAINS = {
+    # chain: (parser, takes product dimensions, fixture argument that scales the document)
+    "cargills": (process_cargils_data, True, "outlets"),
+    "country_style": (process_country_style_data, True, "products"),
+    "softlogic": (process_Softlogic_data, True, "outlets"),
+    "laugfs": (process_Laugfs_data, True, "outlets"),
+    "arpico": (process_Arpico_data, True, "outlets"),
+    "summary": (process_summary_order_data, False, "outlets"),
+    "other": (process_other_data, True, "products"),
+}
+
+RECORDED_DIR = os.path.join(BENCH_DIR, "recorded")
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+
+
+def parse(chain, data):
+    parser, needs_dimensions, _ = CHAINS[chain]
+    return parser(data, PRODUCT_DIMENSIONS) if needs_dimensions else parser(data)
+
+
+def load_documents(chain, count, recorded_dir=RECORDED_DIR):
+    paths = sorted(glob.glob(os.path.join(recorded_dir, chain, "*.json")))
+    if paths:
+        documents = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                documents.append((os.path.basename(path), json.load(f)))
+        return documents
+    # Synthetic documents differ only by seed, so names are stable across runs
+    return [("synthetic-seed-%d" % seed, fixtures.FIXTURES[chain](seed=seed)) for seed in range(count)]
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def canonical(output):
+    # Round trip so tuples/ints/floats compare the way they are stored in the golden file
+    return json.loads(json.dumps(output, sort_keys=True, default=str))
+
+
+def replay_chain(chain, documents, repeat):
+    latencies = []
+    outputs = {}
+    for _ in range(repeat):
+        for name, data in documents:
+            start = time.perf_counter()
+            outputs[name] = parse(chain, data)
+            latencies.append(time.perf_counter() - start)
+
+    # Separate pass for memory, tracemalloc slows the parsers down too much to time them
+    tracemalloc.start()
+    for _, data in documents:
+        parse(chain, data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    lines = sum(line_count(data) for _, data in documents) * repeat
+    latencies.sort()
+    return {
+        "documents": len(documents),
+        "lines_per_second": lines / sum(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_kib": peak / 1024,
+    }, outputs
+
+
+def golden_path(chain, golden_dir=GOLDEN_DIR):
+    return os.path.join(golden_dir, chain + ".json")
+
+
+def check_golden(chain, outputs, golden_dir=GOLDEN_DIR):
+    # Returns (mismatched document names, documents without a golden entry)
+    path = golden_path(chain, golden_dir)
+    if not os.path.exists(path):
+        return [], sorted(outputs)
+    with open(path, encoding="utf-8") as f:
+        golden = json.load(f)
+    mismatched = [name for name in sorted(outputs) if name in golden and canonical(outputs[name]) != golden[name]]
+    return mismatched, [name for name in sorted(outputs) if name not in golden]
+
+
+def update_golden(chain, outputs, golden_dir=GOLDEN_DIR):
+    os.makedirs(golden_dir, exist_ok=True)
+    # One document per line keeps the files small and their diffs readable per document
+    entries = ["%s: %s" % (json.dumps(name), json.dumps(canonical(output), sort_keys=True, separators=(",", ":")))
+               for name, output in sorted(outputs.items())]
+    with open(golden_path(chain, golden_dir), "w", encoding="utf-8", newline="\n") as f:
+        f.write("{\n" + ",\n".join(entries) + "\n}\n")
+
+
+def stress(chains, outlets):
+    print("%-14s %9s %9s %10s %12s %10s" % ("chain", "size", "lines", "seconds", "lines/s", "peak MiB"))
+    for chain in chains:
+        size_argument = CHAINS[chain][2]
+        data = fixtures.FIXTURES[chain](**{size_argument: outlets})
+        lines = line_count(data)
+        start = time.perf_counter()
+        parse(chain, data)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        parse(chain, data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print("%-14s %9d %9d %10.3f %12.0f %10.1f" % (chain, outlets, lines, elapsed, lines / elapsed, peak / 2 ** 20))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded OCR results through the chain parsers")
+    parser.add_argument("--chains", default=",".join(CHAINS), help="comma separated subset of: " + ", ".join(CHAINS))
+    parser.add_argument("--docs", type=int, default=3, help="synthetic documents per chain without recordings")
+    parser.add_argument("--repeat", type=int, default=5, help="timed passes over each chain's documents")
+    parser.add_argument("--recorded", default=RECORDED_DIR, help="directory with <chain>/*.json recordings")
+    parser.add_argument("--update-golden", action="store_true", help="write current outputs as the golden files")
+    parser.add_argument("--stress", type=int, metavar="SIZE", help="scale one synthetic document per chain to SIZE outlets/products")
+    args = parser.parse_args()
+
+    chains = [chain.strip() for chain in args.chains.split(",") if chain.strip()]
+    unknown = [chain for chain in chains if chain not in CHAINS]
+    if unknown:
+        parser.error("unknown chain(s): " + ", ".join(unknown))
+
+    if args.stress:
+        stress(chains, args.stress)
+        return 0
+
+    failed = False
+    print("%-14s %5s %12s %9s %9s %9s %10s  %s" % ("chain", "docs", "lines/s", "p50 ms", "p95 ms", "p99 ms", "peak KiB", "golden"))
+    for chain in chains:
+        documents = load_documents(chain, args.docs, args.recorded)
+        result, outputs = replay_chain(chain, documents, args.repeat)
+        if args.update_golden:
+            update_golden(chain, outputs)
+            status = "updated"
+        else:
+            mismatched, missing = check_golden(chain, outputs)
+            status = "ok" if not mismatched else "MISMATCH " + ", ".join(mismatched)
+            if missing:
+                status += " (%d without golden)" % len(missing)
+            failed = failed or bool(mismatched)
+        print("%-14s %5d %12.0f %9.2f %9.2f %9.2f %10.1f  %s" % (
+            chain, result["documents"], result["lines_per_second"], result["p50_ms"], result["p95_ms"],
+            result["p99_ms"], result["peak_kib"], status))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
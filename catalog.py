@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import numpy as np
+
+from config import DIMENSION_SNAPSHOT
+from matching import MatchIndex
+from utils import load_product_dimensions
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the .npz snapshot changes so old files are ignored
+SNAPSHOT_FORMAT = 1
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+## Binary snapshot--------------------------------------------------------------------------------------------------------------------------------
+# Parsing the xlsx is the slow part of a cold start (every worker process pays
+# it). After a load the table is also written next to the workbook as plain
+# numpy arrays, tagged with the workbook hash, so the next process can skip
+# openpyxl entirely.
+
+def snapshot_path(path):
+    return path + ".dims.npz"
+
+
+def save_dimension_snapshot(path, sha256, product_dimensions):
+    names = np.array(list(product_dimensions), dtype=str)
+    volumes = np.array([value["VolumePerUnit"] for value in product_dimensions.values()], dtype=np.float64)
+    target = snapshot_path(path)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, format=np.array(SNAPSHOT_FORMAT), sha256=np.array(sha256), names=names, volumes=volumes)
+    # Readers only ever see a complete file
+    os.replace(tmp, target)
+
+
+def load_dimension_snapshot(path, sha256):
+    # None means "no usable snapshot": missing, stale, or written by another format
+    try:
+        with np.load(snapshot_path(path), allow_pickle=False) as data:
+            if int(data["format"]) != SNAPSHOT_FORMAT or str(data["sha256"]) != sha256:
+                return None
+            names = data["names"].tolist()
+            volumes = data["volumes"].tolist()
+    except (OSError, ValueError, KeyError):
+        return None
+    return {name: {"Item Name": name, "VolumePerUnit": volume} for name, volume in zip(names, volumes)}
+
+
+class CatalogSnapshot(Mapping):
+    """Immutable view of one load of the dimension table.
+
+    Behaves like the dict returned by load_product_dimensions, so the parsers
+    can keep indexing it by item name. The fuzzy-match index is built here,
+    at load time.
+    """
+
+    def __init__(self, product_dimensions, path, sha256, load_seconds, version):
+        self._items = {key: MappingProxyType(dict(value)) for key, value in product_dimensions.items()}
+        self.path = path
+        self.sha256 = sha256
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.version = version
+        # Built once per load so every request reuses the same normalized keys
+        self.match_index = MatchIndex(self._items)
+
+    def __getitem__(self, key):
+        return self._items[key]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DimensionCatalog:
+    """Process-wide cache of the dimension table.
+
+    The file is parsed once and reused until its mtime/size change and the
+    content hash differs, at which point a new snapshot is swapped in.
+    Requests that already hold a snapshot keep using it untouched.
+    """
+
+    def __init__(self, path, loader=load_product_dimensions, check_interval=1.0, binary_snapshot=DIMENSION_SNAPSHOT):
+        self.path = path
+        self.loader = loader
+        self.check_interval = check_interval
+        self.binary_snapshot = binary_snapshot
+        self._snapshot = None
+        # (st_mtime_ns, st_size) of the file the current snapshot was checked against
+        self._stat = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        # Hits are counted on the lock-free fast path too, so they get their own lock
+        self._hits_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._total_load_seconds = 0.0
+        self._last_error = None
+        self._snapshot_loads = 0
+        self._last_load_source = None
+
+    def _is_current(self, stat):
+        return self._stat == (stat.st_mtime_ns, stat.st_size)
+
+    def _hit(self, snapshot):
+        with self._hits_lock:
+            self._hits += 1
+        return snapshot
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._last_check < self.check_interval:
+            return self._hit(snapshot)
+
+        with self._lock:
+            snapshot = self._snapshot
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                # Keep serving the last good table if the file is briefly missing
+                if snapshot is None:
+                    raise
+                self._last_check = now
+                return self._hit(snapshot)
+
+            if snapshot is not None and self._is_current(stat):
+                self._last_check = now
+                return self._hit(snapshot)
+
+            sha256 = file_sha256(self.path)
+            if snapshot is not None and snapshot.sha256 == sha256:
+                # Touched but not changed: remember the new stat and carry on
+                self._stat = (stat.st_mtime_ns, stat.st_size)
+                self._last_check = now
+                return self._hit(snapshot)
+
+            self._misses += 1
+            start = time.perf_counter()
+            product_dimensions = None
+            if self.binary_snapshot:
+                product_dimensions = load_dimension_snapshot(self.path, sha256)
+            if product_dimensions is not None:
+                self._snapshot_loads += 1
+                self._last_load_source = "snapshot"
+            else:
+                try:
+                    product_dimensions = self.loader(self.path)
+                except Exception as e:
+                    self._last_error = str(e)
+                    if snapshot is None:
+                        raise
+                    # Serve the last good table and retry after check_interval, not on every call
+                    self._last_check = now
+                    return snapshot
+                self._last_load_source = "xlsx"
+                if self.binary_snapshot:
+                    try:
+                        save_dimension_snapshot(self.path, sha256, product_dimensions)
+                    except OSError as e:
+                        # A read-only share still works, it just stays on the slow path
+                        logger.warning("could not write dimension snapshot: %s", e)
+            load_seconds = time.perf_counter() - start
+
+            version = snapshot.version + 1 if snapshot is not None else 1
+            self._snapshot = CatalogSnapshot(product_dimensions, self.path, sha256, load_seconds, version)
+            self._stat = (stat.st_mtime_ns, stat.st_size)
+            if snapshot is not None:
+                self._reloads += 1
+            self._total_load_seconds += load_seconds
+            self._last_error = None
+            self._last_check = now
+            return self._snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "path": self.path,
+            "hits": self._hits,
+            "misses": self._misses,
+            "reloads": self._reloads,
+            "items": len(snapshot) if snapshot is not None else 0,
+            "version": snapshot.version if snapshot is not None else 0,
+            "sha256": snapshot.sha256 if snapshot is not None else None,
+            "last_load_seconds": snapshot.load_seconds if snapshot is not None else None,
+            "total_load_seconds": round(self._total_load_seconds, 6),
+            "last_load_source": self._last_load_source,
+            "snapshot_loads": self._snapshot_loads,
+            "last_error": self._last_error,
+        }
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path, check_interval=1.0):
+    # One DimensionCatalog per table path, shared by every request in the process
+    catalog = _catalogs.get(path)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(path)
+            if catalog is None:
+                catalog = DimensionCatalog(path, check_interval=check_interval)
+                _catalogs[path] = catalog
+    return catalog
@@ -0,0 +1,103 @@
+import os
+
+# Central place for deployment settings. Every value can be overridden with an
+# environment variable so the same code runs on the dev box and the server.
+
+# Product dimension table used for volume calculations
+DIMENSION_TABLE_PATH = os.getenv("PO_DIMENSION_TABLE", r"D:\DS_projects\OCR for PO\Diamension_table.xlsx")
+
+# Minimum seconds between two stat() calls on the dimension table
+CATALOG_CHECK_INTERVAL = float(os.getenv("PO_CATALOG_CHECK_INTERVAL", "1.0"))
+
+# Cache the parsed dimension table as <table>.dims.npz so cold starts skip the xlsx
+DIMENSION_SNAPSHOT = os.getenv("PO_DIMENSION_SNAPSHOT", "1") not in ("0", "false", "off")
+
+# Number of description -> volume results kept across requests
+MATCH_CACHE_SIZE = int(os.getenv("PO_MATCH_CACHE_SIZE", "50000"))
+
+# Request bodies larger than this are refused with 413 before any work starts;
+# /upload/batch has its own, larger limit
+UPLOAD_MAX_BYTES = int(os.getenv("PO_UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+BATCH_MAX_BYTES = int(os.getenv("PO_BATCH_MAX_BYTES", str(500 * 1024 * 1024)))
+# Uploaded files are kept in memory up to this size, then spill to an anonymous temp file.
+# This only bounds multipart parsing: the routes then read the whole PDF into memory for OCR,
+# so memory per request is limited by UPLOAD_MAX_BYTES (BATCH_MAX_BYTES for /upload/batch)
+UPLOAD_SPOOL_BYTES = int(os.getenv("PO_UPLOAD_SPOOL_BYTES", str(8 * 1024 * 1024)))
+
+# Background job pool for /jobs uploads
+JOB_WORKERS = int(os.getenv("PO_JOB_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("PO_JOB_MAX_PENDING", "32"))
+JOB_RESULT_TTL = int(os.getenv("PO_JOB_RESULT_TTL", "3600"))
+# Finished job results kept at once; past this the oldest are dropped before their TTL
+JOB_MAX_RESULTS = int(os.getenv("PO_JOB_MAX_RESULTS", "256"))
+
+# Content-addressed cache of OCR results, keyed by PDF hash + model id
+OCR_CACHE_ENABLED = os.getenv("PO_OCR_CACHE", "1") not in ("0", "false", "off")
+OCR_CACHE_DIR = os.getenv("PO_OCR_CACHE_DIR", "ocr_cache")
+OCR_CACHE_MAX_BYTES = int(os.getenv("PO_OCR_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+OCR_CACHE_MAX_AGE = int(os.getenv("PO_OCR_CACHE_MAX_AGE", str(30 * 24 * 3600)))
+
+# Raw extraction dumps for debugging: off, file (one per request) or queue (background writer)
+DEBUG_DUMP_MODE = os.getenv("PO_DEBUG_DUMP", "off")
+DEBUG_DUMP_DIR = os.getenv("PO_DEBUG_DUMP_DIR", "debug_dumps")
+DEBUG_DUMP_FORMAT = os.getenv("PO_DEBUG_DUMP_FORMAT", "json")  # json or msgpack
+
+# Long PDFs are analyzed in page-range chunks of this size (0 disables splitting)
+OCR_CHUNK_PAGES = int(os.getenv("PO_OCR_CHUNK_PAGES", "10"))
+# Maximum chunks of one document in flight at the same time
+OCR_CHUNK_CONCURRENCY = int(os.getenv("PO_OCR_CHUNK_CONCURRENCY", "4"))
+
+# Azure client: async (one shared aio client and connection pool on a background
+# event loop, see ocr_client.py) or sync (the SDK's blocking client)
+OCR_CLIENT_MODE = os.getenv("PO_OCR_CLIENT", "async")
+# Analyses running at once through the async client, and its HTTP connection pool size
+OCR_MAX_IN_FLIGHT = int(os.getenv("PO_OCR_MAX_IN_FLIGHT", "16"))
+OCR_CONNECTION_LIMIT = int(os.getenv("PO_OCR_CONNECTION_LIMIT", "32"))
+# Status polling: first delay, growth factor and ceiling in seconds. A Retry-After
+# from Azure is never undercut
+OCR_POLL_INITIAL = float(os.getenv("PO_OCR_POLL_INITIAL", "0.25"))
+OCR_POLL_BACKOFF = float(os.getenv("PO_OCR_POLL_BACKOFF", "1.5"))
+OCR_POLL_MAX = float(os.getenv("PO_OCR_POLL_MAX", "1.0"))
+
+# How PDFs are turned into lines: azure (always OCR), text (embedded text layer only)
+# or hybrid (text layer, Azure only for scanned pages)
+EXTRACTION_BACKEND = os.getenv("PO_EXTRACTION_BACKEND", "azure")
+# A page with fewer characters than this in its text layer is treated as scanned
+TEXT_LAYER_MIN_CHARS = int(os.getenv("PO_TEXT_LAYER_MIN_CHARS", "20"))
+# Horizontal gap (pt) that separates two text-layer lines on the same row
+TEXT_LAYER_GAP = float(os.getenv("PO_TEXT_LAYER_GAP", "6"))
+
+# /upload JSON answers: gzip/brotli when the client sends Accept-Encoding and the
+# body is at least this large
+RESPONSE_COMPRESSION = os.getenv("PO_RESPONSE_COMPRESSION", "1") not in ("0", "false", "off")
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("PO_RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("PO_RESPONSE_GZIP_LEVEL", "5"))
+
+# Log level for the app and parsers; DEBUG output is also produced for traced uploads
+LOG_LEVEL = os.getenv("PO_LOG_LEVEL", "INFO")
+# Share of uploads traced at DEBUG level (0.0 - 1.0); clients can force it with the header
+TRACE_SAMPLE_RATE = float(os.getenv("PO_TRACE_SAMPLE_RATE", "0"))
+TRACE_HEADER = "X-PO-Trace"
+
+# Minimum page-1 fingerprint score before a parser is chosen by content rather than file name.
+# A chain name alone scores 3, so the default also needs a second, structural fingerprint.
+PARSER_DETECTION_MIN_SCORE = float(os.getenv("PO_PARSER_DETECTION_MIN_SCORE", "4"))
+
+# /upload/batch: OCR calls in flight at once, parser processes shared by all batches when
+# PO_PARSE_PROCESSES is 0 (0 parses on the OCR threads)
+# and the most PDFs accepted in one request (zip members included)
+# BATCH_MAX_UNZIPPED_BYTES caps the PDFs unpacked from zip archives; BATCH_MAX_BYTES only sees the compressed upload
+BATCH_OCR_WORKERS = int(os.getenv("PO_BATCH_OCR_WORKERS", "4"))
+BATCH_PARSE_WORKERS = int(os.getenv("PO_BATCH_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+BATCH_MAX_FILES = int(os.getenv("PO_BATCH_MAX_FILES", "100"))
+BATCH_MAX_UNZIPPED_BYTES = int(os.getenv("PO_BATCH_MAX_UNZIPPED_BYTES", str(500 * 1024 * 1024)))
+
+# Parser processes with their own warm copy of the dimension table (0 parses in the request thread)
+PARSE_PROCESSES = int(os.getenv("PO_PARSE_PROCESSES", "0"))
+# How parser processes are started. Not fork: the pools start workers lazily inside a threaded
+# server, and a forked child can inherit locks held by other threads. forkserver is not
+# available on Windows, where spawn is used instead.
+PARSE_START_METHOD = os.getenv("PO_PARSE_START_METHOD", "forkserver")
+
+# Return per-stage timings of each request in a Server-Timing response header
+SERVER_TIMING = os.getenv("PO_SERVER_TIMING", "0") not in ("0", "false", "off")
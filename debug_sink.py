@@ -0,0 +1,98 @@
+import logging
+import os
+import queue
+import threading
+import uuid
+
+from config import DEBUG_DUMP_DIR, DEBUG_DUMP_FORMAT, DEBUG_DUMP_MODE
+from ocr_lines import json_bytes, to_serializable
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+
+def serialize(obj, fmt):
+    if fmt == "msgpack" and msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True, default=to_serializable), ".msgpack"
+    return json_bytes(obj), ".json"
+
+
+class DebugSink:
+    """Optional dump of raw extraction results for debugging parsers.
+
+    Modes:
+      off   - nothing is written (default)
+      file  - one file per request/job, written on the calling thread
+      queue - handed to a background writer thread; dropped if it falls behind
+    """
+
+    def __init__(self, mode="off", directory="debug_dumps", fmt="json", max_queue=64):
+        if mode not in ("off", "file", "queue"):
+            raise ValueError("Unknown debug dump mode: %s" % mode)
+        self.mode = mode
+        self.directory = directory
+        self.fmt = fmt
+        self.written = 0
+        self.dropped = 0
+        self._queue = None
+        if mode == "queue":
+            self._queue = queue.Queue(maxsize=max_queue)
+            threading.Thread(target=self._writer, name="po-debug-sink", daemon=True).start()
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def _write_file(self, name, obj):
+        data, suffix = serialize(obj, self.fmt)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name + suffix)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.written += 1
+        return path
+
+    def _writer(self):
+        while True:
+            name, obj = self._queue.get()
+            try:
+                self._write_file(name, obj)
+            except OSError as e:
+                self._drop(name, e)
+            finally:
+                self._queue.task_done()
+
+    def _drop(self, name, error):
+        self.dropped += 1
+        logger.warning("debug dump %s dropped: %s", name, error)
+
+    def write(self, name, obj):
+        # name is usually the job id; callers without one get a random name so
+        # concurrent requests never share a file
+        if self.mode == "off":
+            return
+        name = name or uuid.uuid4().hex
+        if self.mode == "file":
+            # A full disk or unwritable directory must not fail the request being dumped
+            try:
+                self._write_file(name, obj)
+            except OSError as e:
+                self._drop(name, e)
+        else:
+            try:
+                self._queue.put_nowait((name, obj))
+            except queue.Full:
+                self.dropped += 1
+
+    def flush(self):
+        if self._queue is not None:
+            self._queue.join()
+
+
+debug_sink = DebugSink(DEBUG_DUMP_MODE, DEBUG_DUMP_DIR, DEBUG_DUMP_FORMAT)
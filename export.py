@@ -0,0 +1,162 @@
+import csv
+import io
+
+from streaming import outlet_records
+
+try:
+    import xlsxwriter
+except ImportError:  # pragma: no cover - xlsxwriter is optional
+    xlsxwriter = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = {
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+    "csv": ("text/csv; charset=utf-8", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+class ExportError(Exception):
+    pass
+
+
+## Flattening-------------------------------------------------------------------------------------------------------------------------------------
+
+def product_rows(output_data, file_name=None):
+    # One row per product, carrying its outlet's scalar fields. Outlets without
+    # products (summary orders, empty outlets) still give one row so they are not lost.
+    for outlet in outlet_records(output_data):
+        base = {} if file_name is None else {"File": file_name}
+        base.update((key, value) for key, value in outlet.items() if key != "Products")
+        products = outlet.get("Products") or ()
+        if not products:
+            yield base
+            continue
+        for product in products:
+            row = dict(base)
+            row.update(product)
+            yield row
+
+
+def batch_product_rows(batch_output):
+    # run_batch results: only files that parsed, each row tagged with its file name
+    for entry in batch_output["files"]:
+        if entry["status"] == "succeeded":
+            yield from product_rows(entry["result"], entry["file_name"])
+
+
+def export_rows(output_data, file_name=None):
+    # Accepts either a single-document result or a /upload/batch result
+    if isinstance(output_data, dict) and "files" in output_data:
+        return lambda: batch_product_rows(output_data)
+    return lambda: product_rows(output_data, file_name)
+
+
+def scan_columns(rows):
+    # First pass over the rows: column order by first appearance, and which
+    # columns only ever hold numbers (Parquet needs the schema up front)
+    columns = {}
+    for row in rows:
+        for key, value in row.items():
+            numeric = columns.get(key, True)
+            if numeric and value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                numeric = False
+            columns[key] = numeric
+    return list(columns), {key for key, numeric in columns.items() if numeric}
+
+
+## Writers----------------------------------------------------------------------------------------------------------------------------------------
+
+def write_xlsx(rows, columns):
+    # constant_memory flushes each row to a temp file as soon as the next one
+    # starts, so the sheet is never held as cell objects. This is not disk-free:
+    # the sheet data and, on close, the workbook's XML parts go through temp files
+    # in tempfile.gettempdir() before being zipped into the in-memory output.
+    # {"in_memory": True} would avoid the disk but keep every cell in memory.
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    worksheet = workbook.add_worksheet("Products")
+    header = workbook.add_format({"bold": True})
+    worksheet.write_row(0, 0, columns, header)
+    for row_number, row in enumerate(rows, start=1):
+        worksheet.write_row(row_number, 0, [row.get(column) for column in columns])
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+def iter_csv(rows, columns, chunk_rows=500):
+    # Yields encoded chunks; nothing but the current chunk is buffered
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([row.get(column) for column in columns])
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def write_parquet(rows, columns, numeric_columns, batch_rows=10000):
+    schema = pa.schema([(column, pa.float64() if column in numeric_columns else pa.string()) for column in columns])
+    output = io.BytesIO()
+
+    def record_batch(batch):
+        arrays = []
+        for column in columns:
+            if column in numeric_columns:
+                values = [row.get(column) for row in batch]
+            else:
+                values = [None if row.get(column) is None else str(row.get(column)) for row in batch]
+            arrays.append(pa.array(values, type=schema.field(column).type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    with pq.ParquetWriter(output, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_rows:
+                writer.write_batch(record_batch(batch))
+                batch = []
+        if batch:
+            writer.write_batch(record_batch(batch))
+    output.seek(0)
+    return output
+
+
+def check_export_format(fmt):
+    # Called before any OCR work so a bad ?format= fails fast
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format {fmt!r}; use one of {', '.join(EXPORT_FORMATS)}")
+    if fmt == "xlsx" and xlsxwriter is None:
+        raise ExportError("xlsx export needs the xlsxwriter package")
+    if fmt == "parquet" and pa is None:
+        raise ExportError("parquet export needs the pyarrow package")
+
+
+def export(rows_factory, fmt):
+    """Flatten a parser result into an outlet x product table.
+
+    rows_factory returns a fresh row iterator; it is walked once to find the
+    columns and once more while writing. Returns (body, mimetype, extension):
+    a generator of bytes for csv, a BytesIO for xlsx and parquet. xlsx also
+    writes short-lived temp files while the workbook is built.
+    """
+    check_export_format(fmt)
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    columns, numeric_columns = scan_columns(rows_factory())
+    if fmt == "csv":
+        body = iter_csv(rows_factory(), columns)
+    elif fmt == "xlsx":
+        body = write_xlsx(rows_factory(), columns)
+    else:
+        body = write_parquet(rows_factory(), columns, numeric_columns)
+    return body, mimetype, extension
@@ -0,0 +1,235 @@
+import json
+import threading
+import time
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+from azure.core.pipeline.transport import AsyncHttpResponse, AsyncHttpTransport
+from azure.core.utils import CaseInsensitiveDict
+
+
+# Stand-in for azure.ai.formrecognizer.DocumentAnalysisClient that replays a
+# recorded extraction result (the {"pages": [...]} dict written by
+# extract_data_from_pdf). Useful for running the app, the job API and the
+# benchmarks without an Azure endpoint.
+
+
+class _Obj:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def _bounding_regions(page_number):
+    return [_Obj(page_number=page_number, polygon=[])]
+
+
+def parse_page_ranges(pages):
+    # "1-3, 5" -> {1, 2, 3, 5}, the format of the SDK's pages= keyword
+    selected = set()
+    for part in pages.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-")
+            selected.update(range(int(first), int(last) + 1))
+        elif part:
+            selected.add(int(part))
+    return selected
+
+
+def _polygon(bbox):
+    # Two corners are enough for ocr_lines.polygon_bbox to rebuild the box
+    if not bbox:
+        return []
+    return [_Obj(x=bbox[0], y=bbox[1]), _Obj(x=bbox[2], y=bbox[3])]
+
+
+def build_analyze_result(result_dict, pages=None):
+    # Rebuild an AnalyzeResult-like object with the attributes the extractor reads.
+    # pages restricts the result like the SDK's pages="1-3" keyword does.
+    selected = parse_page_ranges(pages) if pages else None
+    pages = []
+    tables = []
+    key_value_pairs = []
+    for index, page in enumerate(result_dict["pages"]):
+        page_number = page.get("page_number", index + 1)
+        if selected is not None and page_number not in selected:
+            continue
+        lines = [_Obj(content=line["text"], polygon=_polygon(line.get("bbox"))) for line in page.get("lines", [])]
+        pages.append(_Obj(page_number=page_number, lines=lines))
+        for cells in page.get("tables", []):
+            tables.append(_Obj(
+                bounding_regions=_bounding_regions(page_number),
+                cells=[_Obj(bounding_regions=_bounding_regions(page_number), **cell) for cell in cells],
+            ))
+        for kvp in page.get("key_value_pairs", []):
+            key_value_pairs.append(_Obj(
+                key=_Obj(content=kvp["key"], bounding_regions=_bounding_regions(page_number)) if kvp.get("key") is not None else None,
+                value=_Obj(content=kvp["value"], bounding_regions=_bounding_regions(page_number)) if kvp.get("value") is not None else None,
+            ))
+    return _Obj(pages=pages, tables=tables, key_value_pairs=key_value_pairs)
+
+
+class FakePoller:
+    def __init__(self, result, latency):
+        self._result = result
+        self._latency = latency
+
+    def result(self):
+        if self._latency:
+            time.sleep(self._latency)
+        return self._result
+
+    def done(self):
+        return True
+
+
+class FakeDocumentAnalysisClient:
+    def __init__(self, result_dict=None, latency=0.0, result_for=None, latency_per_page=0.0):
+        # result_for(document_bytes, **kwargs) -> result dict, for per-document replies.
+        # Each analysis sleeps latency + latency_per_page * pages returned.
+        self.result_dict = result_dict
+        self.latency = latency
+        self.latency_per_page = latency_per_page
+        self.result_for = result_for
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_json(cls, path, latency=0.0):
+        with open(path, "r") as f:
+            return cls(json.load(f), latency=latency)
+
+    def begin_analyze_document(self, model_id, document, **kwargs):
+        with self._lock:
+            self.calls += 1
+        if hasattr(document, "read"):
+            document = document.read()
+        result_dict = self.result_for(document, **kwargs) if self.result_for else self.result_dict
+        result = build_analyze_result(result_dict, pages=kwargs.get("pages"))
+        return FakePoller(result, self.latency + self.latency_per_page * len(result.pages))
+
+
+## In-process fake service------------------------------------------------------------------------------------------------------------------------
+# FakeFormRecognizerTransport answers the REST calls of the real
+# azure.ai.formrecognizer.aio client, so ocr_client.AsyncOcrClient (SDK,
+# polling and all) runs against recorded results without a network.
+
+
+def _rest_polygon(bbox):
+    if not bbox:
+        return []
+    x0, y0, x1, y1 = bbox
+    return [x0, y0, x1, y0, x1, y1, x0, y1]
+
+
+def _rest_regions(page_number):
+    return [{"pageNumber": page_number, "polygon": []}]
+
+
+def _rest_element(content, page_number):
+    return {"content": content, "boundingRegions": _rest_regions(page_number), "spans": []}
+
+
+def rest_analyze_result(result_dict, pages=None):
+    # The analyzeResult JSON body the service would return for a recorded result dict
+    selected = parse_page_ranges(pages) if pages else None
+    rest_pages = []
+    tables = []
+    key_value_pairs = []
+    for index, page in enumerate(result_dict["pages"]):
+        page_number = page.get("page_number", index + 1)
+        if selected is not None and page_number not in selected:
+            continue
+        rest_pages.append({
+            "pageNumber": page_number, "angle": 0, "width": 8.5, "height": 11, "unit": "inch", "spans": [], "words": [],
+            "lines": [{"content": line["text"], "polygon": _rest_polygon(line.get("bbox")), "spans": []}
+                      for line in page.get("lines", [])],
+        })
+        for cells in page.get("tables", []):
+            tables.append({
+                "rowCount": max((cell["row_index"] for cell in cells), default=-1) + 1,
+                "columnCount": max((cell["column_index"] for cell in cells), default=-1) + 1,
+                "cells": [{"rowIndex": cell["row_index"], "columnIndex": cell["column_index"], "content": cell["content"],
+                           "boundingRegions": _rest_regions(page_number), "spans": []} for cell in cells],
+                "boundingRegions": _rest_regions(page_number),
+                "spans": [],
+            })
+        for kvp in page.get("key_value_pairs", []):
+            key_value_pairs.append({
+                "key": _rest_element(kvp["key"], page_number) if kvp.get("key") is not None else None,
+                "value": _rest_element(kvp["value"], page_number) if kvp.get("value") is not None else None,
+                "confidence": 1.0,
+            })
+    return {"apiVersion": "2023-07-31", "modelId": "prebuilt-document", "stringIndexType": "unicodeCodePoint",
+            "content": "", "pages": rest_pages, "tables": tables, "keyValuePairs": key_value_pairs}
+
+
+class _FakeResponse(AsyncHttpResponse):
+    def __init__(self, request, status_code, body=None, headers=None):
+        super().__init__(request, None)
+        self.status_code = status_code
+        self.reason = "OK" if status_code < 300 else "Error"
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content_type = "application/json"
+        self._body = json.dumps(body).encode("utf-8") if body is not None else b""
+
+    def body(self):
+        return self._body
+
+    async def load_body(self):
+        pass
+
+
+class FakeFormRecognizerTransport(AsyncHttpTransport):
+    def __init__(self, result_dict=None, latency=0.0, result_for=None, latency_per_page=0.0, retry_after=None):
+        # Same replies and latency model as FakeDocumentAnalysisClient. An analysis
+        # reports "running" until its latency has passed, with a Retry-After
+        # header (seconds) when retry_after is set.
+        self.result_dict = result_dict
+        self.latency = latency
+        self.latency_per_page = latency_per_page
+        self.result_for = result_for
+        self.retry_after = retry_after
+        self.submits = 0
+        self.polls = 0
+        self._operations = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send(self, request, **kwargs):
+        url = urlparse(request.url)
+        if request.method == "POST" and url.path.endswith(":analyze"):
+            self.submits += 1
+            pages = parse_qs(url.query).get("pages", [None])[0]
+            result_dict = self.result_for(request.body, pages=pages) if self.result_for else self.result_dict
+            result = rest_analyze_result(result_dict, pages=pages)
+            operation_id = uuid.uuid4().hex
+            ready_at = time.monotonic() + self.latency + self.latency_per_page * len(result["pages"])
+            self._operations[operation_id] = (ready_at, result)
+            location = "%s://%s%s/analyzeResults/%s?api-version=%s" % (
+                url.scheme, url.netloc, url.path[:-len(":analyze")], operation_id, parse_qs(url.query)["api-version"][0])
+            return _FakeResponse(request, 202, headers={"Operation-Location": location})
+
+        if request.method == "GET" and "/analyzeResults/" in url.path:
+            self.polls += 1
+            operation = self._operations.get(url.path.rsplit("/", 1)[1])
+            if operation is None:
+                return _FakeResponse(request, 404, {"error": {"code": "NotFound", "message": "Unknown operation"}})
+            ready_at, result = operation
+            if time.monotonic() < ready_at:
+                headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+                return _FakeResponse(request, 200, {"status": "running"}, headers)
+            return _FakeResponse(request, 200, {"status": "succeeded", "createdDateTime": "2024-01-01T00:00:00Z",
+                                                "lastUpdatedDateTime": "2024-01-01T00:00:00Z", "analyzeResult": result})
+
+        return _FakeResponse(request, 404, {"error": {"code": "NotFound", "message": request.url}})
@@ -0,0 +1,95 @@
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import process_document
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobManager:
+    """Runs OCR + chain parsing for uploaded POs on a bounded thread pool.
+
+    Submitting returns a job id immediately; the Flask worker is free again
+    while Azure is being polled. Finished jobs are kept for `result_ttl`
+    seconds so clients can collect them, and at most `max_results` of them:
+    past that the oldest finished job is dropped first.
+    """
+
+    def __init__(self, max_workers=4, max_pending=32, result_ttl=3600, max_results=256, parse_pool=None):
+        self.max_pending = max_pending
+        # Optional ParsePool; when set, parsing leaves this process and get_product_dimensions is unused
+        self.parse_pool = parse_pool
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="po-job")
+        self._jobs = {}
+        # Finished job ids, oldest first
+        self._finished = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pending_count(self):
+        return sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+
+    def _evict_expired(self):
+        now = time.time()
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if now - finished_at <= self.result_ttl and len(self._finished) <= self.max_results:
+                break
+            del self._finished[job_id]
+            del self._jobs[job_id]
+
+    def submit(self, pdf_bytes, file_name, get_product_dimensions, backend):
+        with self._lock:
+            self._evict_expired()
+            if self._pending_count() >= self.max_pending:
+                raise QueueFullError("Too many PO jobs in progress, try again later")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "file_name": file_name,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+        # Run in a copy of the caller's context so a traced upload stays traced on the worker
+        context = contextvars.copy_context()
+        self._executor.submit(context.run, self._run, job_id, pdf_bytes, file_name, get_product_dimensions, backend)
+        return job_id
+
+    def _run(self, job_id, pdf_bytes, file_name, get_product_dimensions, backend):
+        job = self._jobs[job_id]
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        try:
+            extracted_data = backend.extract(pdf_bytes, job_id=job_id)
+            if self.parse_pool is not None:
+                job["result"] = self.parse_pool.parse(extracted_data, file_name)
+            else:
+                job["result"] = process_document(extracted_data, file_name, get_product_dimensions)
+            job["status"] = "succeeded"
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "failed"
+        finally:
+            with self._lock:
+                job["finished_at"] = time.time()
+                self._finished[job_id] = job["finished_at"]
+                self._evict_expired()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
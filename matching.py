@@ -0,0 +1,200 @@
+import itertools
+import re
+import threading
+from collections import OrderedDict, defaultdict
+
+from rapidfuzz import process, fuzz
+
+from config import MATCH_CACHE_SIZE
+from metrics import match_cache_hits, match_lookups
+
+# Minimum token_sort_ratio for the fuzzy fallback
+FUZZY_SCORE_CUTOFF = 70
+# Descriptions scored per cdist call: the float32 score matrix is rows x catalog keys,
+# so 64 rows against a 20k-row table stay around 5 MB
+FUZZY_CHUNK_ROWS = 64
+
+_non_alnum_pattern = re.compile(r'[^a-z0-9\s]')
+_whitespace_pattern = re.compile(r'\s+')
+
+
+def normalize(text):
+    text = text.lower()
+    text = _non_alnum_pattern.sub('', text)
+    text = _whitespace_pattern.sub(' ', text).strip()
+    return text
+
+
+def all_tokens_in(text_a, text_b):
+    # Check if all tokens of text_a exist in text_b
+    tokens_a = set(text_a.split())
+    tokens_b = set(text_b.split())
+    return tokens_a.issubset(tokens_b)
+
+
+_index_ids = itertools.count(1)
+
+
+class VolumeCache:
+    """Bounded LRU of (index, normalized description) -> volume per unit.
+
+    Shared by every request in the process: the same SKUs show up on every PO
+    from a chain. Keys include the index id, so a reloaded catalog never sees
+    answers computed against the old one.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, index_id, descriptions_norm):
+        found = {}
+        with self._lock:
+            for description_norm in descriptions_norm:
+                key = (index_id, description_norm)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[description_norm] = self._entries[key]
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return found
+
+    def put_many(self, index_id, volumes):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            for description_norm, volume in volumes.items():
+                self._entries[(index_id, description_norm)] = volume
+                self._entries.move_to_end((index_id, description_norm))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+volume_cache = VolumeCache(MATCH_CACHE_SIZE)
+
+
+class MatchIndex:
+    """Pre-normalized view of the dimension table for description lookups.
+
+    Matching rules are the ones get_closest_match always used:
+    1. the first table row (in sheet order) whose tokens all appear in the
+       description wins;
+    2. otherwise the row with the best token_sort_ratio >= 70 wins.
+    """
+
+    def __init__(self, product_dimensions):
+        self.index_id = next(_index_ids)
+        self.keys = []
+        self.keys_norm = []
+        self.volumes = []
+        self._token_counts = []
+        self._postings = defaultdict(list)
+
+        for key, details in product_dimensions.items():
+            key_norm = normalize(key)
+            tokens = set(key_norm.split())
+            # A key with no usable tokens would be a subset of every description
+            if not tokens:
+                continue
+            position = len(self.keys)
+            self.keys.append(key)
+            self.keys_norm.append(key_norm)
+            self.volumes.append(details["VolumePerUnit"])
+            self._token_counts.append(len(tokens))
+            for token in tokens:
+                self._postings[token].append(position)
+
+        self._postings = dict(self._postings)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def subset_match(self, description_norm):
+        # Count, per key, how many of its tokens occur in the description.
+        # Keys whose every token was seen are subset matches; sheet order breaks ties.
+        hits = {}
+        for token in set(description_norm.split()):
+            for position in self._postings.get(token, ()):
+                hits[position] = hits.get(position, 0) + 1
+
+        best = None
+        for position, count in hits.items():
+            if count == self._token_counts[position] and (best is None or position < best):
+                best = position
+        return best
+
+    def lookup(self, description):
+        return self.resolve_many([description])[description]
+
+    def resolve_many(self, descriptions, cache=None):
+        # Resolve a whole document's descriptions at once: deduplicate, serve
+        # what the LRU already knows, try subset matches, then score every
+        # remaining description against the catalog with cdist, FUZZY_CHUNK_ROWS at a time.
+        cache = volume_cache if cache is None else cache
+        norms = {description: normalize(description) for description in set(descriptions)}
+        unique_norms = set(norms.values())
+
+        volumes = cache.get_many(self.index_id, unique_norms)
+        match_lookups.inc(len(unique_norms))
+        match_cache_hits.inc(len(volumes))
+        resolved = {}
+        unmatched = []
+        for description_norm in unique_norms:
+            if description_norm in volumes:
+                continue
+            position = self.subset_match(description_norm)
+            if position is None:
+                unmatched.append(description_norm)
+            else:
+                resolved[description_norm] = self.volumes[position]
+
+        if unmatched and self.keys_norm:
+            for start in range(0, len(unmatched), FUZZY_CHUNK_ROWS):
+                chunk = unmatched[start:start + FUZZY_CHUNK_ROWS]
+                scores = process.cdist(
+                    chunk, self.keys_norm, scorer=fuzz.token_sort_ratio,
+                    processor=None, score_cutoff=FUZZY_SCORE_CUTOFF
+                )
+                # argmax returns the first best key, the same tie rule as extractOne
+                best_positions = scores.argmax(axis=1)
+                for row, description_norm in enumerate(chunk):
+                    position = int(best_positions[row])
+                    if scores[row, position] >= FUZZY_SCORE_CUTOFF:
+                        resolved[description_norm] = self.volumes[position]
+                    else:
+                        resolved[description_norm] = None
+        else:
+            for description_norm in unmatched:
+                resolved[description_norm] = None
+
+        cache.put_many(self.index_id, resolved)
+        volumes.update(resolved)
+        return {description: volumes[description_norm] for description, description_norm in norms.items()}
+
+
+# Plain dicts passed to get_closest_match get an index built once and reused
+# for as long as the same dict object is handed in.
+_plain_index = None
+_plain_index_lock = threading.Lock()
+
+
+def get_match_index(product_dimensions):
+    global _plain_index
+    index = getattr(product_dimensions, "match_index", None)
+    if index is not None:
+        return index
+
+    with _plain_index_lock:
+        cached = _plain_index
+        if cached is not None and cached[0] is product_dimensions and cached[1] == len(product_dimensions):
+            return cached[2]
+        index = MatchIndex(product_dimensions)
+        _plain_index = (product_dimensions, len(product_dimensions), index)
+        return index
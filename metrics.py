@@ -0,0 +1,184 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal in-process metrics with Prometheus text exposition (see /metrics).
+# Values live in this process only; parser processes (parse_pool.py) keep their own.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_metrics = []
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join('%s="%s"' % (name, value) for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = ["# HELP %s %s" % (self.name, self.documentation), "# TYPE %s %s" % (self.name, self.kind)]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            # Unlabelled counters are exported as 0 before their first increment
+            self._values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self, items):
+        return ["%s%s %s" % (self.name, _format_labels(self.labelnames, key), _format_value(value))
+                for key, value in items]
+
+
+class Gauge(Counter):
+    # A value that also goes down, e.g. requests in flight
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (last slot is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state is not None else 0
+
+    def _render_samples(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(float(bound))
+                lines.append("%s_bucket%s %d" % (self.name, _format_labels(self.labelnames, key, [("le", le)]), cumulative))
+            lines.append("%s_sum%s %s" % (self.name, _format_labels(self.labelnames, key), _format_value(total)))
+            lines.append("%s_count%s %d" % (self.name, _format_labels(self.labelnames, key), count))
+        return lines
+
+
+def render_metrics():
+    return "\n".join(line for metric in _metrics for line in metric.render()) + "\n"
+
+
+## PO pipeline metrics----------------------------------------------------------------------------------------------------------------------------
+
+stage_seconds = Histogram("po_stage_seconds", "Time spent per upload stage", ["stage"])
+request_seconds = Histogram("po_request_seconds", "HTTP request duration", ["endpoint", "status"])
+parser_seconds = Histogram("po_parser_seconds", "Chain parser run time including volume matching", ["parser"])
+parser_documents = Counter("po_parser_documents_total", "Documents parsed", ["parser", "result"])
+parser_lines = Counter("po_parser_lines_total", "OCR lines fed to chain parsers", ["parser"])
+match_lookups = Counter("po_match_lookups_total", "Distinct product descriptions resolved against the catalog")
+match_cache_hits = Counter("po_match_cache_hits_total", "Descriptions answered by the volume LRU cache")
+ocr_cache_requests = Counter("po_ocr_cache_requests_total", "OCR result cache lookups", ["result"])
+ocr_in_flight = Gauge("po_ocr_in_flight", "Azure analyses submitted and not yet finished")
+ocr_analyses = Counter("po_ocr_analyses_total", "Azure analyses run by the shared async client", ["result"])
+ocr_polls = Counter("po_ocr_polls_total", "Status polls sent while waiting on Azure analyses")
+
+
+## Per-request timings----------------------------------------------------------------------------------------------------------------------------
+
+# List of (stage, seconds) for the current request, None outside one
+_request_timings = contextvars.ContextVar("po_request_timings", default=None)
+
+
+def start_request_timings():
+    return _request_timings.set([])
+
+
+def end_request_timings(token):
+    if token is not None:
+        _request_timings.reset(token)
+
+
+def request_timings():
+    return _request_timings.get() or []
+
+
+@contextmanager
+def span(stage, histogram=None, **labels):
+    # Times a block into po_stage_seconds{stage} (or the given histogram and
+    # labels) and into the current request's timings for Server-Timing
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if histogram is None:
+            stage_seconds.observe(elapsed, stage=stage)
+        else:
+            histogram.observe(elapsed, **labels)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def summed_timings(timings):
+    # Repeated stages (e.g. several OCR chunks) are summed, first-seen order kept
+    totals = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return totals
+
+
+def server_timing_header(timings):
+    return ", ".join("%s;dur=%.1f" % (stage, seconds * 1000) for stage, seconds in summed_timings(timings).items())
@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+
+from config import OCR_CACHE_DIR, OCR_CACHE_ENABLED, OCR_CACHE_MAX_AGE, OCR_CACHE_MAX_BYTES
+from ocr_lines import json_bytes, json_loads
+
+logger = logging.getLogger(__name__)
+
+
+class OCRCache:
+    """Content-addressed on-disk cache of extraction results.
+
+    Entries are keyed by SHA-256 of the PDF bytes plus the model id and stored
+    as zlib-compressed compact JSON. Entries older than `max_age` seconds are
+    dropped, and the least recently used ones go first once the directory
+    grows past `max_bytes`.
+    """
+
+    suffix = ".json.z"
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024, max_age=30 * 24 * 3600, enabled=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.write_errors = 0
+
+    @staticmethod
+    def make_key(pdf_bytes, model_id):
+        digest = hashlib.sha256()
+        digest.update(model_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(pdf_bytes)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if time.time() - stat.st_mtime > self.max_age:
+                self._remove(path, stat.st_size)
+                self.misses += 1
+                return None
+            with open(path, "rb") as f:
+                result_dict = json_loads(zlib.decompress(f.read()))
+            # Bump the mtime so eviction treats this entry as recently used
+            os.utime(path)
+        except (OSError, ValueError, zlib.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result_dict
+
+    def put(self, key, result_dict):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        data = zlib.compress(json_bytes(result_dict), 6)
+        # Write to a unique temp name and rename, so concurrent readers never see half a file
+        tmp_path = "%s.%d.%d.tmp" % (path, os.getpid(), threading.get_ident())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            with self._lock:
+                self.writes += 1
+                if self._total_bytes is None:
+                    self._total_bytes = self._scan_size()
+                else:
+                    self._total_bytes += len(data)
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+        except OSError as e:
+            # The OCR result is already paid for; an unwritable cache must not fail the request
+            self.write_errors += 1
+            logger.warning("OCR cache write failed for %s: %s", key, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for bucket in os.scandir(self.directory):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if entry.name.endswith(self.suffix):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _remove(self, path, size):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        self.evictions += 1
+        if self._total_bytes is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        now = time.time()
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        self._total_bytes = total
+        for mtime, size, path in entries:
+            if now - mtime > self.max_age or self._total_bytes > self.max_bytes:
+                self._remove(path, size)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "write_errors": self.write_errors,
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+ocr_cache = OCRCache(OCR_CACHE_DIR, max_bytes=OCR_CACHE_MAX_BYTES, max_age=OCR_CACHE_MAX_AGE, enabled=OCR_CACHE_ENABLED)
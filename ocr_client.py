@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import threading
+
+from azure.ai.formrecognizer import DocumentAnalysisClient
+from azure.ai.formrecognizer.aio import DocumentAnalysisClient as AsyncDocumentAnalysisClient
+from azure.core.credentials import AzureKeyCredential
+from azure.core.polling.async_base_polling import AsyncLROBasePolling
+
+from config import (OCR_CLIENT_MODE, OCR_CONNECTION_LIMIT, OCR_MAX_IN_FLIGHT, OCR_POLL_BACKOFF, OCR_POLL_INITIAL,
+                    OCR_POLL_MAX)
+from metrics import ocr_analyses, ocr_in_flight, ocr_polls
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - aiohttp is optional, the sync client is used without it
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+## Polling----------------------------------------------------------------------------------------------------------------------------------------
+
+def retry_after_seconds(headers):
+    # Azure sends Retry-After in seconds; the -ms variants win when present
+    for name, scale in (("retry-after-ms", 0.001), ("x-ms-retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                return None  # HTTP-date form, not used by Form Recognizer
+    return None
+
+
+class AdaptivePolling(AsyncLROBasePolling):
+    """Status polling that starts fast and backs off.
+
+    The SDK waits a fixed polling_interval between status calls, so a
+    one-page PO that is ready after 1.2s is only seen after the next full
+    interval. Here the delays grow from `initial` by `backoff` up to `maximum`,
+    and never go below a Retry-After the service sent.
+    """
+
+    def __init__(self, initial=OCR_POLL_INITIAL, maximum=OCR_POLL_MAX, backoff=OCR_POLL_BACKOFF, **kwargs):
+        super().__init__(timeout=initial, **kwargs)
+        self._next_delay = initial
+        self.maximum = maximum
+        self.backoff = backoff
+        self.polls = 0
+
+    def next_delay(self, retry_after=None):
+        delay = self._next_delay
+        self._next_delay = min(self._next_delay * self.backoff, self.maximum)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _extract_delay(self):
+        return self.next_delay(retry_after_seconds(self._pipeline_response.http_response.headers))
+
+    async def update_status(self):
+        self.polls += 1
+        ocr_polls.inc()
+        await super().update_status()
+
+
+## Shared async client----------------------------------------------------------------------------------------------------------------------------
+
+class FuturePoller:
+    # What begin_analyze_document returns: the sync SDK poller's result()/done()
+    def __init__(self, future):
+        self._future = future
+
+    def result(self, timeout=None):
+        return self._future.result(timeout)
+
+    def done(self):
+        return self._future.done()
+
+
+class AsyncOcrClient:
+    """One azure.ai.formrecognizer.aio client for the whole process.
+
+    The client, its HTTP connection pool and every status poll live on a
+    single background event loop, so any number of analyses wait on Azure
+    without holding a thread each. begin_analyze_document() has the same
+    shape as the sync SDK call and returns a poller whose result() blocks,
+    so the thread-based callers (chunked analysis, batches, jobs) use it
+    unchanged; async code can await analyze() on the client's loop.
+
+    transport replaces the aiohttp transport, e.g. with
+    fake_ocr.FakeFormRecognizerTransport to run against an in-process fake
+    service.
+    """
+
+    def __init__(self, endpoint, api_key, max_in_flight=OCR_MAX_IN_FLIGHT, connection_limit=OCR_CONNECTION_LIMIT,
+                 poll_initial=OCR_POLL_INITIAL, poll_backoff=OCR_POLL_BACKOFF, poll_max=OCR_POLL_MAX, transport=None):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.max_in_flight = max_in_flight
+        self.connection_limit = connection_limit
+        self.poll_initial = poll_initial
+        self.poll_backoff = poll_backoff
+        self.poll_max = poll_max
+        self._transport = transport
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Started on first use so importing utils does not spawn a thread
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name="po-ocr-loop", daemon=True)
+                    self._thread.start()
+                    try:
+                        asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+                    except Exception:
+                        loop.call_soon_threadsafe(loop.stop)
+                        raise
+                    self._loop = loop
+        return self._loop
+
+    async def _open(self):
+        transport = self._transport
+        if transport is None:
+            from azure.core.pipeline.transport import AioHttpTransport
+            # One pool for all analyses; the session has to be created on this loop
+            session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.connection_limit))
+            transport = AioHttpTransport(session=session, session_owner=True)
+        self._client = AsyncDocumentAnalysisClient(self.endpoint, AzureKeyCredential(self.api_key), transport=transport)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    def polling(self):
+        return AdaptivePolling(self.poll_initial, self.poll_max, self.poll_backoff)
+
+    async def analyze(self, model_id, document, **kwargs):
+        async with self._semaphore:
+            ocr_in_flight.inc()
+            try:
+                poller = await self._client.begin_analyze_document(model_id, document, polling=self.polling(), **kwargs)
+                result = await poller.result()
+            except Exception:
+                ocr_analyses.inc(result="failed")
+                raise
+            finally:
+                ocr_in_flight.dec()
+        ocr_analyses.inc(result="succeeded")
+        return result
+
+    def begin_analyze_document(self, model_id, document, **kwargs):
+        loop = self._ensure_started()
+        if hasattr(document, "read"):
+            document = document.read()
+        return FuturePoller(asyncio.run_coroutine_threadsafe(self.analyze(model_id, document, **kwargs), loop))
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+            if loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join()
+            loop.close()
+
+
+def make_ocr_client(endpoint, api_key, mode=OCR_CLIENT_MODE):
+    if mode == "async":
+        if aiohttp is not None:
+            return AsyncOcrClient(endpoint, api_key)
+        logger.warning("PO_OCR_CLIENT=async needs aiohttp; falling back to the sync Azure client")
+    return DocumentAnalysisClient(endpoint=endpoint, credential=AzureKeyCredential(api_key))
@@ -0,0 +1,94 @@
+# Compact per-line record for extraction results. A page's "lines" is a tuple
+# of Line objects instead of a list of {"text": ...} dicts: the text is
+# stripped once at ingest, and __slots__ keeps each line at a fraction of a
+# dict's size. Line["text"] / Line.get("text") keep dict-style callers working.
+
+import orjson
+
+
+class Line:
+    __slots__ = ("text", "bbox", "confidence")
+
+    def __init__(self, text, bbox=None, confidence=None):
+        self.text = text.strip()
+        self.bbox = bbox  # (x0, y0, x1, y1) in page units, or None
+        self.confidence = confidence
+
+    def __getitem__(self, key):
+        if key in Line.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in Line.__slots__ else default
+
+    def __contains__(self, key):
+        return key in Line.__slots__
+
+    def __eq__(self, other):
+        if isinstance(other, Line):
+            return (self.text, self.bbox, self.confidence) == (other.text, other.bbox, other.confidence)
+        return NotImplemented
+
+    def __repr__(self):
+        return "Line(%r)" % self.text
+
+    def to_dict(self):
+        # Same shape as the old line dicts; bbox/confidence only when known
+        data = {"text": self.text}
+        if self.bbox is not None:
+            data["bbox"] = list(self.bbox)
+        if self.confidence is not None:
+            data["confidence"] = self.confidence
+        return data
+
+
+def as_line(line):
+    # Adapter for lines in the old dict format (cached results, recorded fixtures)
+    if isinstance(line, Line):
+        return line
+    if isinstance(line, str):
+        return Line(line)
+    bbox = line.get("bbox")
+    return Line(line["text"], tuple(bbox) if bbox is not None else None, line.get("confidence"))
+
+
+def compact_lines(lines):
+    return tuple(as_line(line) for line in lines)
+
+
+def compact_page(page):
+    # Copy of a page dict with its lines as Line records
+    page = dict(page)
+    page["lines"] = compact_lines(page["lines"])
+    return page
+
+
+def page_texts(page):
+    # Pre-stripped text of every line on the page; what the chain parsers index
+    return tuple(line.text if type(line) is Line else line.get("text", "").strip() for line in page["lines"])
+
+
+def polygon_bbox(polygon):
+    # Azure gives a line's outline as a list of points
+    if not polygon:
+        return None
+    xs = [point.x for point in polygon]
+    ys = [point.y for point in polygon]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def to_serializable(obj):
+    # default= hook for orjson/json/msgpack when dumping results that hold Lines
+    if isinstance(obj, Line):
+        return obj.to_dict()
+    raise TypeError("Object of type %s is not serializable" % type(obj).__name__)
+
+
+def json_bytes(obj):
+    # Compact UTF-8 JSON for everything the service writes: responses, stream events, cache entries, dumps
+    return orjson.dumps(obj, default=to_serializable, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def json_loads(data):
+    return orjson.loads(data)
@@ -0,0 +1,93 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import get_catalog
+from config import PARSE_START_METHOD
+from utils import process_document
+
+log = logging.getLogger("po.parse_pool")
+
+# Set in each worker process by _init_worker
+_worker_catalog_path = None
+_worker_check_interval = 1.0
+
+
+def _init_worker(catalog_path, check_interval):
+    global _worker_catalog_path, _worker_check_interval
+    _worker_catalog_path = catalog_path
+    _worker_check_interval = check_interval
+    # Load the table and build its match index before the first document arrives
+    try:
+        _worker_product_dimensions()
+    except Exception as e:
+        # Parsers that need the table will raise the same error per document
+        log.warning("Parser worker %s could not load %s: %s", os.getpid(), catalog_path, e)
+
+
+def _worker_product_dimensions():
+    # The worker's own DimensionCatalog: read from disk once, reloaded only when the file changes
+    return get_catalog(_worker_catalog_path, _worker_check_interval).snapshot()
+
+
+def _parse(extracted_data, file_name):
+    return process_document(extracted_data, file_name, _worker_product_dimensions)
+
+
+def _ping(_=None):
+    # Long enough that the pool starts a new worker instead of reusing an idle one
+    time.sleep(0.05)
+    return os.getpid()
+
+
+class ParsePool:
+    """Process pool for the CPU-bound half of an upload (chain parser + volume matching).
+
+    Each worker process loads the dimension table and its match index once, in
+    the pool initializer, and keeps them warm across documents; only the
+    extracted OCR data and the parser output cross the process boundary.
+    """
+
+    def __init__(self, max_workers, catalog_path, check_interval=1.0, start_method=PARSE_START_METHOD):
+        self.max_workers = max_workers
+        self.catalog_path = catalog_path
+        if start_method not in multiprocessing.get_all_start_methods():
+            start_method = "spawn"
+        self.start_method = start_method
+        # Workers load the table by path in _init_worker, so nothing relies on fork's copy of this process
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker, initargs=(catalog_path, check_interval)
+        )
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._failed = 0
+
+    def submit(self, extracted_data, file_name):
+        # extracted_data["pages"] must be a list here; generators do not pickle
+        with self._lock:
+            self._submitted += 1
+        future = self._executor.submit(_parse, extracted_data, file_name)
+        future.add_done_callback(self._count_failure)
+        return future
+
+    def _count_failure(self, future):
+        if future.exception() is not None:
+            with self._lock:
+                self._failed += 1
+
+    def parse(self, extracted_data, file_name):
+        return self.submit(extracted_data, file_name).result()
+
+    def warm(self):
+        # Start every worker now so the first uploads do not pay for process start + table load
+        return sorted({pid for pid in self._executor.map(_ping, range(self.max_workers))})
+
+    def stats(self):
+        return {"workers": self.max_workers, "start_method": self.start_method, "submitted": self._submitted, "failed": self._failed}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,185 @@
+import re
+
+from registry import Fingerprint
+
+# Precompiled patterns and small helpers used by the chain parsers in utils.py.
+# Everything here is built once at import time instead of inside the line loops.
+# Helpers taking `lines` expect a page's pre-stripped texts (ocr_lines.page_texts).
+# *_COLUMNS map table fields to lower-case header aliases for table_rows.TableRows.
+# The *_FINGERPRINT lists are scored against page 1 to pick the parser (see registry.py).
+
+## Shared---------------------------------------------------------------------------------------------------------------------------------------
+
+TRAILING_PUNCTUATION = re.compile(r'[,:\.]+$')
+DECIMAL_VALUE = re.compile(r"^\d+(\.\d+)?$")
+
+
+def next_match_index(lines, pattern):
+    # next_index[j] is the first index >= j whose text matches pattern (None if
+    # there is none); built backwards in a single pass. Has len(lines) + 1 entries.
+    next_index = [None] * (len(lines) + 1)
+    for j in range(len(lines) - 1, -1, -1):
+        next_index[j] = j if pattern.search(lines[j]) else next_index[j + 1]
+    return next_index
+
+## Cargills-------------------------------------------------------------------------------------------------------------------------------------
+
+CARGILLS_PRODUCT_CODE = re.compile(r"^[A-Z]{2,3}\d{3,5}$")
+CARGILLS_OUTLET_CODE = re.compile(r'^\d{3,4}\b')
+# Full "1234 EX Outlet Name" line, used to re-anchor rows when OCR scrambles a product
+CARGILLS_OUTLET_LINE = re.compile(r'^\d{3,4}\s+(EX|FH|FC)\s+.+')
+CARGILLS_QTY = re.compile(r'^[1-9]\d{0,2}(\.00)?$')
+
+CARGILLS_COLUMNS = {
+    "code": ("product code", "item code", "code"),
+    "name": ("product name", "description", "item description"),
+    "qty": ("qty", "quantity", "order qty"),
+    "net": ("net value", "net amount"),
+    "vat": ("vat", "vat value", "vat amount"),
+}
+
+CARGILLS_FINGERPRINT = [
+    Fingerprint(r"Cargills", 3),
+    Fingerprint(CARGILLS_PRODUCT_CODE, 0.5, max_hits=6),
+    Fingerprint(CARGILLS_OUTLET_LINE, 1, max_hits=2),
+]
+
+
+def is_valid_product_name(name):
+    return len(name.split()) >= 2 and any(c.isalpha() for c in name)
+
+
+def lowest_qty_candidate(lines, outlet_line_index, window=20):
+    # Smallest quantity-looking value in the `window` lines above an outlet line,
+    # formatted like "12.00"; None when nothing in the window looks like a quantity
+    lowest = None
+    for k in range(outlet_line_index - 1, max(outlet_line_index - window - 1, -1), -1):
+        candidate = lines[k]
+        if CARGILLS_QTY.match(candidate):
+            value = float(candidate.replace('.00', ''))
+            if lowest is None or value < lowest:
+                lowest = value
+    return f"{int(lowest)}.00" if lowest is not None else None
+
+## Country Style--------------------------------------------------------------------------------------------------------------------------------
+
+COUNTRY_STYLE_PRODUCT_CODE = re.compile(r"^\d{4,6}$")
+COUNTRY_STYLE_OUTLETS = ('BG', 'KL', 'KW', 'NE', 'PL', 'TR')
+
+COUNTRY_STYLE_COLUMNS = {
+    "code": ("code", "product code", "item code"),
+    "name": ("description", "product name", "item name"),
+    "price": ("price", "unit price", "cost price"),
+    **{outlet: (outlet.lower(),) for outlet in COUNTRY_STYLE_OUTLETS},
+}
+
+COUNTRY_STYLE_FINGERPRINT = [
+    Fingerprint(r"PDK", 3),
+    Fingerprint(r"^(BG|KL|KW|NE|PL|TR)$", 0.5, max_hits=6),
+    Fingerprint(COUNTRY_STYLE_PRODUCT_CODE, 0.25, max_hits=4),
+]
+
+## Softlogic------------------------------------------------------------------------------------------------------------------------------------
+
+SOFTLOGIC_OUTLET_CODE = re.compile(r"^\d{5}$")  # Exactly 5-digit numeric codes
+SOFTLOGIC_ITEM_CODE = re.compile(r"^\d{6}$")  # 6-digit item codes
+
+SOFTLOGIC_COLUMNS = {
+    "code": ("item code", "code"),
+    "name": ("description", "item description", "product name"),
+    "price": ("price", "unit price", "cost price"),
+    "vat": ("vat", "vat %"),
+    "qty": ("order in quantity", "order qty", "quantity", "qty"),
+}
+
+SOFTLOGIC_FINGERPRINT = [
+    Fingerprint(r"Softlogic", 3),
+    Fingerprint(SOFTLOGIC_ITEM_CODE, 0.25, max_hits=8),
+]
+
+
+def get_decimal_value(lines, start_index, max_index):
+    # First decimal number at or after start_index
+    index = start_index
+    while index < max_index:
+        value = lines[index]
+        if DECIMAL_VALUE.match(value):  # Check if the value is a decimal number
+            return value, index
+        index += 1
+    return None, start_index  # Fallback to original index if no valid value is found
+
+## Laugfs---------------------------------------------------------------------------------------------------------------------------------------
+
+# Outlet name: every word capitalised, e.g. "Kandy" or "Nuwara Eliya"
+LAUGFS_OUTLET_NAME = re.compile(r"^[A-Z][a-z]+(\s[A-Z][a-z]+)*$")
+LAUGFS_ITEM_CODE = re.compile(r"^\d{4,7}$")
+LAUGFS_COLUMN_NAMES = frozenset({"Code", "Item Name", "Cost Price", "VAT Cost Price", "Quantity", "Qty", "CostPrice", "Vat Cost Price", "Vat"})
+
+LAUGFS_COLUMNS = {
+    "code": ("code", "item code"),
+    "name": ("item name", "description"),
+    "vat_cost": ("vat cost price",),
+    "qty": ("quantity", "qty"),
+}
+
+LAUGFS_FINGERPRINT = [
+    Fingerprint(r"Laugfs", 3),
+    Fingerprint(r"^(Item Name|Cost Price|CostPrice|VAT Cost Price|Vat Cost Price)$", 1, max_hits=2),
+]
+
+
+def get_valid_value(lines, start_index, max_index):
+    # Next value that is not a "-" placeholder
+    index = start_index
+    while index < max_index and lines[index] == "-":
+        index += 1
+    return lines[index], index
+
+## Arpico---------------------------------------------------------------------------------------------------------------------------------------
+
+# Order No, optionally followed by PLU and item code on the same line
+ARPICO_ORDER_LINE = re.compile(r"^\d{8,11}$|^\d{8,11} \d{5,6}$|^\d{8,11} \d{5,6} [A-Z]{4}\d{5,10}$")
+ARPICO_ITEM_CODE = re.compile(r"^[A-Z]{4}\d{5,10}$")  # 4 letters followed by 5-10 digits
+ARPICO_OUTLET_SUFFIXES = ("SS", "SC", "Daily")
+
+ARPICO_COLUMNS = {
+    "code": ("item code",),
+    "name": ("description", "item description"),
+    "rate": ("rate",),
+    "vat": ("vat", "vat %"),
+    "qty": ("ordered", "order qty", "quantity"),
+}
+
+ARPICO_FINGERPRINT = [
+    Fingerprint(r"Arpico", 3),
+    Fingerprint(r"(?i)^supply$", 1),
+    Fingerprint(ARPICO_ORDER_LINE, 0.5, max_hits=4),
+]
+
+
+def is_valid_outlet_name(name):
+    # Arpico outlet names end with SS, SC or Daily
+    return name.endswith(ARPICO_OUTLET_SUFFIXES)
+
+
+def is_valid_item_code(code):
+    return ARPICO_ITEM_CODE.match(code) is not None
+
+## Cargills summary-----------------------------------------------------------------------------------------------------------------------------
+
+SUMMARY_OUTLET_CODE = re.compile(r"^\d{4}$")
+
+SUMMARY_FINGERPRINT = [
+    Fingerprint(r"Cargills", 3),
+    Fingerprint(r"(?i)summary", 2),
+    Fingerprint(SUMMARY_OUTLET_CODE, 0.5, max_hits=6),
+]
+
+## Other POs------------------------------------------------------------------------------------------------------------------------------------
+
+OTHER_OUTLET_NAME = re.compile(r"^[A-Z]{3,4}\d?$")
+
+OTHER_FINGERPRINT = [
+    Fingerprint(r"Country", 2),
+    Fingerprint(r"^\*\S+", 0.5, max_hits=6),
+]
@@ -0,0 +1,56 @@
+import contextvars
+import logging
+import random
+import uuid
+
+from config import LOG_LEVEL, TRACE_HEADER, TRACE_SAMPLE_RATE
+
+# Logging for the PO pipeline. Parsers get their own logger under "po.parsers"
+# and log through ParserLogger, which lets DEBUG records through for a single
+# traced upload even when the process runs at INFO.
+
+_trace_id = contextvars.ContextVar("po_trace_id", default=None)
+
+
+class ParserLogger(logging.LoggerAdapter):
+    def isEnabledFor(self, level):
+        return self.logger.isEnabledFor(level) or _trace_id.get() is not None
+
+    def process(self, msg, kwargs):
+        trace_id = _trace_id.get()
+        if trace_id is not None:
+            msg = "[trace %s] %s" % (trace_id, msg)
+        return msg, kwargs
+
+    def log(self, level, msg, *args, **kwargs):
+        # Messages are %-formatted by the handler, only once a record is emitted
+        if self.isEnabledFor(level):
+            msg, kwargs = self.process(msg, kwargs)
+            # Bypass the logger's own level check: a traced request logs below it
+            self.logger._log(level, msg, args, **kwargs)
+
+
+def get_parser_logger(chain):
+    return ParserLogger(logging.getLogger("po.parsers." + chain), {})
+
+
+def start_trace(headers=None, sample_rate=TRACE_SAMPLE_RATE):
+    # Trace this request if the client asked for it (X-PO-Trace: 1) or it is
+    # picked by sampling. Returns a token for end_trace, or None.
+    requested = headers is not None and headers.get(TRACE_HEADER, "") not in ("", "0")
+    if not requested and not (sample_rate > 0 and random.random() < sample_rate):
+        return None
+    return _trace_id.set(uuid.uuid4().hex[:12])
+
+
+def end_trace(token):
+    if token is not None:
+        _trace_id.reset(token)
+
+
+def current_trace_id():
+    return _trace_id.get()
+
+
+def configure_logging(level=LOG_LEVEL):
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
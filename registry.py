@@ -0,0 +1,192 @@
+import itertools
+import re
+import threading
+from collections import OrderedDict
+
+from config import PARSER_DETECTION_MIN_SCORE
+from ocr_lines import page_texts
+from metrics import parser_documents, parser_lines, parser_seconds, span
+from po_logging import get_parser_logger
+
+# Registry of chain parsers. Each parser registers a cheap fingerprint that is
+# scored against the lines of page 1 to decide which parser a PO belongs to, so
+# routing no longer depends on how the file happens to be named.
+
+log = get_parser_logger("registry")
+
+_non_letters = re.compile(r"[^a-z]+")
+
+
+class Fingerprint:
+    # Adds `weight` for each page-1 line matching `pattern`, counting at most `max_hits` lines
+    def __init__(self, pattern, weight=1.0, max_hits=1):
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.weight = weight
+        self.max_hits = max_hits
+
+
+class ParserSpec:
+    def __init__(self, name, parse, fingerprints, filename_hints, filenames, needs_dimensions, priority, chain):
+        self.name = name
+        self.parse = parse
+        self.fingerprints = fingerprints
+        self.filename_hints = filename_hints
+        self.filenames = filenames
+        self.needs_dimensions = needs_dimensions
+        self.priority = priority
+        self.chain = chain
+
+
+PARSERS = OrderedDict()
+_fallback_name = None
+
+
+def register_parser(name, fingerprints=(), filename_hints=(), filenames=(), needs_dimensions=True, priority=0,
+                    chain=None, fallback=False):
+    # Decorator for process_* functions. filename_hints match anywhere in the file name,
+    # filenames only the whole name. priority breaks ties between equal scores (e.g. Cargills
+    # summary over Cargills); parsers of one supplier share a chain. The fallback parser
+    # handles anything unrecognised.
+    def decorator(parse):
+        global _fallback_name
+        PARSERS[name] = ParserSpec(name, parse, list(fingerprints), [hint.lower() for hint in filename_hints],
+                                   [filename.lower() for filename in filenames], needs_dimensions, priority,
+                                   chain or name)
+        if fallback:
+            _fallback_name = name
+        return parse
+    return decorator
+
+
+def score_first_page(lines, specs=None):
+    # Single pass over page 1's texts: every line is tested against every fingerprint
+    specs = PARSERS if specs is None else specs
+    hits = {name: [0] * len(spec.fingerprints) for name, spec in specs.items()}
+    for text in lines:
+        if not text:
+            continue
+        for name, spec in specs.items():
+            counts = hits[name]
+            for i, fingerprint in enumerate(spec.fingerprints):
+                if counts[i] < fingerprint.max_hits and fingerprint.pattern.search(text):
+                    counts[i] += 1
+
+    return {
+        name: sum(fingerprint.weight * count for fingerprint, count in zip(spec.fingerprints, hits[name]))
+        for name, spec in specs.items()
+    }
+
+
+def best_parser(scores):
+    return max(scores.items(), key=lambda item: (item[1], PARSERS[item[0]].priority))
+
+
+class DetectionCache:
+    """Bounded LRU of supplier header -> chain.
+
+    The header key is the letters of the first few non-empty lines of page 1,
+    so order numbers and dates do not break it. Only the supplier is cached:
+    one header can start both a chain's regular POs and its summaries, so a
+    hit still scores that chain's parsers, just not every other chain's.
+    """
+
+    def __init__(self, maxsize=256, header_lines=3):
+        self.maxsize = maxsize
+        self.header_lines = header_lines
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def header_key(self, lines):
+        header = []
+        for text in lines:
+            letters = _non_letters.sub(" ", text.lower()).strip()
+            if letters:
+                header.append(letters)
+                if len(header) == self.header_lines:
+                    break
+        return tuple(header) or None
+
+    def get(self, key):
+        with self._lock:
+            chain = self._entries.get(key)
+            if chain is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return chain
+
+    def put(self, key, chain):
+        with self._lock:
+            self._entries[key] = chain
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+detection_cache = DetectionCache()
+
+
+def parser_from_filename(file_name):
+    file_name = (file_name or "").lower()
+    for spec in sorted(PARSERS.values(), key=lambda spec: -spec.priority):
+        if file_name in spec.filenames or any(hint in file_name for hint in spec.filename_hints):
+            return spec
+    return None
+
+
+def detect_parser(first_page, file_name=None, min_score=PARSER_DETECTION_MIN_SCORE):
+    lines = page_texts(first_page) if first_page else ()
+    key = detection_cache.header_key(lines)
+    if key is not None:
+        chain = detection_cache.get(key)
+        if chain is not None:
+            specs = {name: spec for name, spec in PARSERS.items() if spec.chain == chain}
+            name, score = best_parser(score_first_page(lines, specs))
+            if score >= min_score:
+                return PARSERS[name]
+
+    name, score = best_parser(score_first_page(lines))
+    if score >= min_score:
+        log.info("Detected %s parser for %s (score %.1f)", name, file_name, score)
+        if key is not None:
+            detection_cache.put(key, PARSERS[name].chain)
+        return PARSERS[name]
+
+    # Content was not conclusive: fall back to the file name, then the catch-all parser
+    spec = parser_from_filename(file_name) or PARSERS[_fallback_name]
+    log.info("No parser fingerprint matched %s (best %s %.1f), using %s", file_name, name, score, spec.name)
+    return spec
+
+
+def _count_lines(pages, parser_name):
+    for page in pages:
+        parser_lines.inc(len(page["lines"]), parser=parser_name)
+        yield page
+
+
+def run_parser(extracted_data, file_name, get_product_dimensions):
+    # Peek at page 1 without consuming the page stream
+    pages = iter(extracted_data["pages"])
+    first_page = next(pages, None)
+    spec = detect_parser(first_page, file_name)
+
+    data = dict(extracted_data)
+    pages = itertools.chain([first_page], pages) if first_page is not None else pages
+    data["pages"] = _count_lines(pages, spec.name)
+    try:
+        with span("parse", parser_seconds, parser=spec.name):
+            if spec.needs_dimensions:
+                result = spec.parse(data, get_product_dimensions())
+            else:
+                result = spec.parse(data)
+    except Exception:
+        parser_documents.inc(parser=spec.name, result="error")
+        raise
+    parser_documents.inc(parser=spec.name, result="ok")
+    return result
@@ -0,0 +1,121 @@
+import gzip
+
+from flask import Response
+
+from config import RESPONSE_COMPRESSION, RESPONSE_COMPRESS_MIN_BYTES, RESPONSE_GZIP_LEVEL
+from ocr_lines import json_bytes
+from streaming import outlet_records
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+RESPONSE_SHAPES = ("records", "columnar")
+
+
+## Encoding---------------------------------------------------------------------------------------------------------------------------------------
+
+def accepted_encodings(accept_encoding):
+    # {"gzip": 1.0, "br": 0.5, ...}; codings with q=0 are refused by the client
+    encodings = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[coding.strip().lower()] = quality
+    return encodings
+
+
+def negotiate_encoding(accept_encoding):
+    encodings = accepted_encodings(accept_encoding)
+    # Brotli first when both are offered: smaller output at similar speed for JSON
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    for coding in candidates:
+        if encodings.get(coding, encodings.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress(body, coding):
+    if coding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL)
+
+
+def json_response(obj, status=200, accept_encoding=None):
+    """orjson-encoded JSON response, compressed when the client accepts it.
+
+    Small bodies are sent as is; below RESPONSE_COMPRESS_MIN_BYTES the
+    compression costs more than the bytes it saves.
+    """
+    body = json_bytes(obj)
+    response = Response(body, status=status, mimetype="application/json")
+    if RESPONSE_COMPRESSION:
+        response.vary.add("Accept-Encoding")
+        if len(body) >= RESPONSE_COMPRESS_MIN_BYTES:
+            coding = negotiate_encoding(accept_encoding)
+            if coding is not None:
+                response.set_data(compress(body, coding))
+                response.headers["Content-Encoding"] = coding
+    return response
+
+
+## Columnar shape---------------------------------------------------------------------------------------------------------------------------------
+
+def columnar(output_data):
+    """Outlet x product rows as {"columns", "rows", "data": {column: [values]}}.
+
+    Same table as export.product_rows, but built column by column straight
+    from the outlets. Field names are sent once instead of once per product,
+    and pandas.DataFrame(payload["data"]) loads it directly. A /upload/batch
+    result keeps its per-file status list; the products of all files share
+    one table with a "File" column.
+    """
+    is_batch = isinstance(output_data, dict) and "files" in output_data
+    if is_batch:
+        outlets = [(entry["file_name"], outlet) for entry in output_data["files"] if entry["status"] == "succeeded"
+                   for outlet in outlet_records(entry["result"])]
+    else:
+        outlets = [(None, outlet) for outlet in outlet_records(output_data)]
+
+    # Column order by first appearance, as scan_columns would see the rows
+    columns = {"File": None} if is_batch else {}
+    for _, outlet in outlets:
+        columns.update(dict.fromkeys(key for key in outlet if key != "Products"))
+        for product in outlet.get("Products") or ():
+            columns.update(dict.fromkeys(product))
+    columns = list(columns)
+
+    data = {column: [] for column in columns}
+    for file_name, outlet in outlets:
+        products = outlet.get("Products") or ()
+        for column in columns:
+            value = file_name if column == "File" else outlet.get(column)
+            if products:
+                # Product fields win over outlet fields of the same name, as in product_rows
+                data[column].extend([product.get(column, value) for product in products])
+            else:
+                data[column].append(value)
+    rows = sum(len(outlet.get("Products") or ()) or 1 for _, outlet in outlets)
+
+    payload = {"columns": columns, "rows": rows, "data": data}
+    if is_batch:
+        payload["files"] = [{key: value for key, value in entry.items() if key != "result"}
+                            for entry in output_data["files"]]
+        payload["succeeded"] = output_data["succeeded"]
+        payload["failed"] = output_data["failed"]
+    return payload
+
+
+def shape_output(output_data, shape):
+    if shape == "columnar":
+        return columnar(output_data)
+    return output_data
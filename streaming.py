@@ -0,0 +1,92 @@
+import contextvars
+import queue
+import threading
+
+from metrics import request_timings, summed_timings
+from ocr_lines import json_bytes
+from utils import process_document
+
+_DONE = object()
+
+# Seconds between checks for a disconnected client while the event queue is full
+PUT_TIMEOUT = 0.5
+
+
+class StreamCancelled(Exception):
+    pass
+
+
+def ndjson_line(obj):
+    return json_bytes(obj) + b"\n"
+
+
+def outlet_records(output_data):
+    # process_other_data wraps its outlets in {"Outlet Details": [...]}
+    if isinstance(output_data, dict):
+        return output_data.get("Outlet Details", [])
+    return output_data
+
+
+def stream_document(pdf_bytes, file_name, get_product_dimensions, backend, job_id=None):
+    """Start extracting and parsing a PO; returns a generator of NDJSON events.
+
+    Extracted pages are fed to the chain parser one at a time on a worker thread;
+    a {"event": "page"} line is emitted as each page is consumed, followed by
+    one {"event": "outlet"} line per outlet and a final {"event": "done"}
+    carrying the request's stage timings.
+
+    Not a generator itself: the worker thread is started here, while the
+    caller's request context (trace id, timing spans) is still active.
+    """
+    events = queue.Queue(maxsize=256)
+    cancelled = threading.Event()
+
+    def put(event):
+        # Gives up once the client is gone, instead of blocking on a queue nobody drains
+        while not cancelled.is_set():
+            try:
+                events.put(event, timeout=PUT_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+        raise StreamCancelled()
+
+    def pages():
+        for page in backend.iter_pages(pdf_bytes, job_id=job_id):
+            put({"event": "page", "page_number": page.get("page_number"), "lines": len(page["lines"])})
+            yield page
+
+    def run():
+        try:
+            output_data = process_document({"pages": pages()}, file_name, get_product_dimensions)
+            for outlet in outlet_records(output_data):
+                put({"event": "outlet", **outlet})
+            # Server-Timing is sent before the body, so a streamed request reports its stages here
+            timings = summed_timings(request_timings())
+            put({"event": "done", "timings": {stage: round(seconds * 1000, 1) for stage, seconds in timings.items()}})
+            put(_DONE)
+        except StreamCancelled:
+            pass
+        except Exception as e:
+            try:
+                put({"event": "error", "error": str(e)})
+                put(_DONE)
+            except StreamCancelled:
+                pass
+
+    # The parser thread inherits the request's trace state and timing list
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(run,), name="po-stream", daemon=True).start()
+    return iter_events(events, cancelled)
+
+
+def iter_events(events, cancelled):
+    try:
+        while True:
+            event = events.get()
+            if event is _DONE:
+                return
+            yield ndjson_line(event)
+    finally:
+        # Also runs when the server closes the generator after a client disconnect
+        cancelled.set()
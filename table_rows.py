@@ -0,0 +1,103 @@
+import re
+from collections import defaultdict, deque
+from operator import itemgetter
+
+# Table-driven access to product rows. Azure returns each table as cells with
+# row_index/column_index; a page's tables are turned into a grid once, the
+# columns are mapped by their header text, and rows are queued per item code.
+# Parsers still find item codes and outlets in the line stream, but read the
+# row's fields with one lookup instead of fixed line offsets and forward scans.
+
+_header_noise = re.compile(r"[^a-z0-9%]+")
+_row_index = itemgetter("row_index")
+_column_index = itemgetter("column_index")
+
+
+def header_key(text):
+    # "VAT Cost\nPrice:" -> "vat cost price"
+    return _header_noise.sub(" ", text.lower()).strip()
+
+
+def table_grid(cells):
+    rows = max(map(_row_index, cells)) + 1
+    columns = max(map(_column_index, cells)) + 1
+    grid = [[""] * columns for _ in range(rows)]
+    for cell in cells:
+        content = cell["content"]
+        if content:
+            grid[cell["row_index"]][cell["column_index"]] = content.strip()
+    return grid
+
+
+def column_aliases(columns):
+    # columns is {field: (header aliases, ...)}; returns {alias: field}
+    return {alias: field for field, names in columns.items() for alias in names}
+
+
+def map_columns(row, aliases):
+    # Returns {field: column index} for the header cells that name a known field
+    mapping = {}
+    for index, text in enumerate(row):
+        field = aliases.get(header_key(text))
+        if field is not None and field not in mapping:
+            mapping[field] = index
+    return mapping
+
+
+class TableRows:
+    """Product rows of one chain's order tables, keyed by item code.
+
+    load_page() indexes the tables of a page; take(code) returns the next
+    unread row for that code (a code can repeat for several outlets on one
+    page) or None, in which case the parser falls back to line offsets.
+    A table without a header row (continued from the previous page) is read
+    with the last header seen if it has the same number of columns.
+    """
+
+    def __init__(self, columns, key_field, header_rows=3):
+        self.aliases = column_aliases(columns)
+        self.key_field = key_field
+        self.header_rows = header_rows
+        self._header = None
+        self._width = None
+        self._rows = {}
+
+    def _find_header(self, grid):
+        for index, row in enumerate(grid[:self.header_rows]):
+            mapping = map_columns(row, self.aliases)
+            if self.key_field in mapping and len(mapping) > 1:
+                return index, mapping
+        return None, None
+
+    def load_page(self, page):
+        self._rows = defaultdict(deque)
+        for cells in page.get("tables") or ():
+            if not cells:
+                continue
+            grid = table_grid(cells)
+            header_index, mapping = self._find_header(grid)
+            if mapping is not None:
+                self._header, self._width = mapping, len(grid[0])
+                body = grid[header_index + 1:]
+            elif self._header is not None and len(grid[0]) == self._width:
+                body = grid
+            else:
+                continue  # not an order table for this chain
+            key_column = self._header[self.key_field]
+            rows = self._rows
+            for row in body:
+                key = row[key_column]
+                if key:
+                    rows[key].append((row, self._header))
+        return self
+
+    def take(self, key, required=()):
+        # Rows missing any required field are skipped so the line path handles them
+        rows = self._rows.get(key)
+        if not rows:
+            return None
+        row, header = rows.popleft()
+        values = {field: row[index] for field, index in header.items()}
+        if any(not values.get(field) for field in required):
+            return None
+        return values
@@ -1,8 +1,150 @@
 import os
-from flask import Flask, request, jsonify, render_template
-from utils import extract_data_from_pdf, load_product_dimensions, process_cargils_data, process_summary_order_data, process_country_style_data, process_Softlogic_data, process_Laugfs_data, process_Arpico_data, process_other_data
+import tempfile
+import time
+import unicodedata
+from urllib.parse import quote
+from flask import Flask, Request, Response, g, request, jsonify, render_template, send_file
+from werkzeug.exceptions import RequestEntityTooLarge
+from backends import get_backend
+from batch import BatchTooLargeError, expand_uploads, run_batch
+from catalog import get_catalog
+from config import (BATCH_MAX_BYTES, BATCH_MAX_FILES, BATCH_MAX_UNZIPPED_BYTES, BATCH_OCR_WORKERS, BATCH_PARSE_WORKERS,
+                    CATALOG_CHECK_INTERVAL, DIMENSION_TABLE_PATH, EXTRACTION_BACKEND, JOB_MAX_PENDING, JOB_MAX_RESULTS,
+                    JOB_RESULT_TTL, JOB_WORKERS, PARSE_PROCESSES, SERVER_TIMING, UPLOAD_MAX_BYTES, UPLOAD_SPOOL_BYTES)
+from export import ExportError, check_export_format, export, export_rows
+from jobs import JobManager, QueueFullError
+from matching import volume_cache
+from metrics import (end_request_timings, render_metrics, request_seconds, request_timings, server_timing_header, span,
+                     start_request_timings)
+from ocr_cache import ocr_cache
+from parse_pool import ParsePool
+from registry import detection_cache
+from responses import RESPONSE_SHAPES, json_response, shape_output
+from po_logging import configure_logging, current_trace_id, end_trace, start_trace
+from streaming import stream_document
+from utils import process_document
+
+
+class SpooledRequest(Request):
+    # Each uploaded file gets its own buffer: in memory up to UPLOAD_SPOOL_BYTES, then an
+    # unnamed temp file that disappears on close, so concurrent uploads never share a path.
+    # The routes still read each PDF into memory; see UPLOAD_SPOOL_BYTES in config.py
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode="w+b")
+
 
 app = Flask(__name__)
+app.request_class = SpooledRequest
+# Checked against Content-Length before the body is read, and again while streaming it
+app.config["MAX_CONTENT_LENGTH"] = UPLOAD_MAX_BYTES
+
+# Set app.config["OCR_CLIENT"] to swap the Azure client, e.g. for a fake_ocr client in tests
+app.config.setdefault("OCR_CLIENT", None)
+
+# PO_PARSE_PROCESSES > 0 moves parsing and volume matching off the GIL into warm worker processes
+parse_pool = ParsePool(PARSE_PROCESSES, DIMENSION_TABLE_PATH, CATALOG_CHECK_INTERVAL) if PARSE_PROCESSES > 0 else None
+
+# Batches reuse that pool, or get one long-lived pool of their own; workers load the table by path
+if parse_pool is not None or BATCH_PARSE_WORKERS <= 0:
+    batch_parse_pool = parse_pool
+else:
+    batch_parse_pool = ParsePool(BATCH_PARSE_WORKERS, DIMENSION_TABLE_PATH, CATALOG_CHECK_INTERVAL)
+
+job_manager = JobManager(max_workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING, result_ttl=JOB_RESULT_TTL,
+                         max_results=JOB_MAX_RESULTS, parse_pool=parse_pool)
+
+
+@app.before_request
+def batch_upload_limit():
+    # Must run before anything touches request.files
+    if request.endpoint == "upload_batch":
+        request.max_content_length = BATCH_MAX_BYTES
+
+@app.before_request
+def begin_request_trace():
+    # Uploads sent with X-PO-Trace: 1 (or sampled via PO_TRACE_SAMPLE_RATE) log parser details at DEBUG
+    g.trace_token = start_trace(request.headers)
+    g.timings_token = start_request_timings()
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def add_trace_header(response):
+    trace_id = current_trace_id()
+    if trace_id is not None:
+        response.headers["X-PO-Trace-Id"] = trace_id
+    if request.endpoint != "metrics" and "request_start" in g:
+        request_seconds.observe(time.perf_counter() - g.request_start, endpoint=request.endpoint or "unknown",
+                                status=response.status_code)
+    if SERVER_TIMING and request_timings():
+        response.headers["Server-Timing"] = server_timing_header(request_timings())
+    return response
+
+@app.teardown_request
+def finish_request_trace(exc):
+    end_trace(g.pop("trace_token", None))
+    end_request_timings(g.pop("timings_token", None))
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    return jsonify({"error": f"Upload exceeds the {request.max_content_length} byte limit"}), 413
+
+
+def current_product_dimensions():
+    with span("catalog"):
+        return get_catalog(DIMENSION_TABLE_PATH, CATALOG_CHECK_INTERVAL).snapshot()
+
+
+def parse_document(extracted_data, file_name):
+    if parse_pool is not None:
+        return parse_pool.parse(extracted_data, file_name)
+    # Summary orders carry no volume work, so the dimension table is only loaded when a parser needs it
+    return process_document(extracted_data, file_name, current_product_dimensions)
+
+
+def extraction_backend():
+    # PO_EXTRACTION_BACKEND picks azure, text or hybrid; see backends.py
+    return get_backend(app.config.get("EXTRACTION_BACKEND", EXTRACTION_BACKEND), ocr_client=app.config["OCR_CLIENT"])
+
+
+def requested_output():
+    # ?format=xlsx|csv|parquet turns an upload's answer into a download; default is JSON.
+    # ?shape=columnar sends JSON as one list per column instead of nested outlets
+    fmt = request.args.get("format", "json").lower()
+    if fmt != "json":
+        check_export_format(fmt)
+    shape = request.args.get("shape", "records").lower()
+    if shape not in RESPONSE_SHAPES:
+        raise ValueError(f"Unknown response shape {shape!r}; use one of {', '.join(RESPONSE_SHAPES)}")
+    return fmt, shape
+
+
+def upload_response(output_data, shape):
+    with span("serialize"):
+        return json_response(shape_output(output_data, shape), accept_encoding=request.headers.get("Accept-Encoding"))
+
+
+def attachment_names(download_name):
+    # Content-Disposition parameters as send_file builds them: an ASCII filename plus an
+    # RFC 5987 filename* when the upload name is not ASCII (headers must stay Latin-1)
+    try:
+        download_name.encode("ascii")
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", download_name).encode("ascii", "ignore").decode("ascii")
+        return {"filename": simple, "filename*": "UTF-8''" + quote(download_name, safe="!#$&+-.^_`|~")}
+    return {"filename": download_name}
+
+
+def export_response(output_data, file_name, fmt, download_stem):
+    with span("serialize"):
+        body, mimetype, extension = export(export_rows(output_data, file_name), fmt)
+    download_name = f"Total_vol_n_sales_{download_stem}{extension}"
+    if fmt == "csv":
+        # Streamed chunk by chunk; the table is never built in full
+        response = Response(body, mimetype=mimetype)
+        response.headers.set("Content-Disposition", "attachment", **attachment_names(download_name))
+        return response
+    return send_file(body, mimetype=mimetype, as_attachment=True, download_name=download_name)
 
 
 @app.route('/upload', methods=['POST'])
@@ -12,46 +154,136 @@ def upload_pdf():
     file = request.files['file']
     if file.filename == '':
         return jsonify({"error": "No selected file"}), 400
+    try:
+        fmt, shape = requested_output()
+    except (ExportError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    pdf_name = os.path.splitext(os.path.basename(file.filename))[0] # Get the file name without extension for the export download name
+
+    try:
+        # Straight from the spooled upload buffer; nothing is written under uploads/
+        with span("read"):
+            pdf_bytes = file.read()
+        with span("ocr"):
+            extracted_data = extraction_backend().extract(pdf_bytes)
+
+        output_data = parse_document(extracted_data, file.filename)
+
+        if fmt != "json":
+            return export_response(output_data, None, fmt, pdf_name)
+        return upload_response(output_data, shape), 200  # Return JSON response with status 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/upload/stream', methods=['POST'])
+def upload_pdf_stream():
+    # Same as /upload, but answers with NDJSON events as pages are parsed
+    if 'file' not in request.files:
+        return jsonify({"error": "No file part"}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No selected file"}), 400
+
+    # Read the upload before returning; the request stream is gone once the response starts
+    pdf_bytes = file.read()
+    events = stream_document(pdf_bytes, file.filename, current_product_dimensions, extraction_backend())
+    return Response(events, mimetype="application/x-ndjson")
+
+@app.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    # Several PDFs (repeat the "files" field) and/or zip archives of PDFs in one request
+    files = [file for file in request.files.getlist('files') + request.files.getlist('file') if file.filename != '']
+    if not files:
+        return jsonify({"error": "No files in request"}), 400
+    try:
+        fmt, shape = requested_output()
+    except (ExportError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
 
-    file_path = os.path.join("uploads", file.filename)
-    pdf_name = os.path.splitext(os.path.basename(file_path))[0] # Get the file name without extension for create excel file name based on pdf name
-    os.makedirs("uploads", exist_ok=True)  # Ensure the upload folder exists
-    file.save(file_path)
-
-    try:
-        extracted_data = extract_data_from_pdf(file_path)
-        excel_path = "D:\DS_projects\OCR for PO\Diamension_table.xlsx"
-        product_dimensions = load_product_dimensions(excel_path)
-
-        # Additional logic for data extraction based on file name or content
-        pdf_file_name = file.filename.lower()
-        if "Cargills Summary".lower() in pdf_file_name:
-            output_data = process_summary_order_data(extracted_data)
-        elif "Cargills".lower() in pdf_file_name:
-            output_data = process_cargils_data(extracted_data, product_dimensions)
-        elif pdf_file_name == "country style.pdf":
-            output_data = process_country_style_data(extracted_data, product_dimensions)
-        elif "Softlogic".lower() in pdf_file_name:
-            output_data = process_Softlogic_data(extracted_data, product_dimensions)
-        elif "Laugfs P".lower() in pdf_file_name:
-            output_data = process_Laugfs_data(extracted_data, product_dimensions)
-        elif "Arpico".lower() in pdf_file_name:
-            output_data = process_Arpico_data(extracted_data, product_dimensions)
-        else:
-            # Custom extraction logic for other PDFs
-            output_data = process_other_data(extracted_data, product_dimensions)
-            
-        # create_excel(output_data, pdf_name)
-        return jsonify(output_data), 200  # Return JSON response with status 200
+    try:
+        documents = expand_uploads([(file.filename, file.read()) for file in files], max_files=BATCH_MAX_FILES,
+                                   max_unzipped_bytes=BATCH_MAX_UNZIPPED_BYTES)
+    except BatchTooLargeError as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        return jsonify({"error": f"Could not read upload: {e}"}), 400
+    if not documents:
+        return jsonify({"error": "No PDF files in request"}), 400
 
+    try:
+        output_data = run_batch(documents, current_product_dimensions, extraction_backend(),
+                                ocr_workers=BATCH_OCR_WORKERS, parse_pool=batch_parse_pool)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    if fmt != "json":
+        return export_response(output_data, None, fmt, "batch")
+    return upload_response(output_data, shape), 200
 
-    finally:
-        if os.path.exists(file_path):
-            os.remove(file_path)
+@app.route('/export', methods=['POST'])
+def export_result():
+    # Re-export a JSON result from /upload, /upload/batch or /jobs without running OCR again
+    output_data = request.get_json(silent=True)
+    if output_data is None:
+        return jsonify({"error": "Expected the JSON result of an upload as the request body"}), 400
+    if isinstance(output_data, dict) and "result" in output_data and "files" not in output_data:
+        output_data = output_data["result"]  # a /jobs/<id> record
+    try:
+        fmt = request.args.get("format", "xlsx").lower()
+        check_export_format(fmt)
+        return export_response(output_data, None, fmt, request.args.get("name", "export"))
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+    except (AttributeError, KeyError, TypeError):
+        return jsonify({"error": "Request body is not an upload result"}), 400
 
-if __name__ == '__main__':
-    app.run(debug=True, port=5013)
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    if 'file' not in request.files:
+        return jsonify({"error": "No file part"}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No selected file"}), 400
 
+    try:
+        job_id = job_manager.submit(
+            file.read(), file.filename, current_product_dimensions, extraction_backend()
+        )
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    return json_response(job, accept_encoding=request.headers.get("Accept-Encoding")), 200
+
+@app.route('/catalog/stats', methods=['GET'])
+def catalog_stats():
+    stats = get_catalog(DIMENSION_TABLE_PATH, CATALOG_CHECK_INTERVAL).stats()
+    stats["match_cache"] = volume_cache.stats()
+    stats["parser_detection"] = detection_cache.stats()
+    if parse_pool is not None:
+        stats["parse_pool"] = parse_pool.stats()
+    if batch_parse_pool is not None and batch_parse_pool is not parse_pool:
+        stats["batch_parse_pool"] = batch_parse_pool.stats()
+    return jsonify(stats), 200
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # Prometheus text format; stage, parser and match counters of this process
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/ocr/cache/stats', methods=['GET'])
+def ocr_cache_stats():
+    return jsonify(ocr_cache.stats()), 200
+
+if __name__ == '__main__':
+    configure_logging()
+    if parse_pool is not None:
+        parse_pool.warm()
+    app.run(debug=True, port=5013)
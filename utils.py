@@ -1,12 +1,29 @@
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
-import json
-import os
-from collections import defaultdict
-import re
+import io
+import logging
+from collections import defaultdict, deque
+import numpy as np
 import pandas as pd
-from rapidfuzz import process, fuzz
+from pandas.api.types import is_numeric_dtype
 import math
+from concurrent.futures import ThreadPoolExecutor
+from PyPDF2 import PdfReader
+from config import OCR_CHUNK_CONCURRENCY, OCR_CHUNK_PAGES
+from matching import get_match_index, normalize, all_tokens_in
+from ocr_lines import Line, compact_page, page_texts, polygon_bbox
+from table_rows import TableRows
+from ocr_cache import ocr_cache
+from debug_sink import debug_sink
+from metrics import ocr_cache_requests, span
+from ocr_client import make_ocr_client
+from po_logging import get_parser_logger
+from registry import register_parser, run_parser
+from parser_rules import (TRAILING_PUNCTUATION, CARGILLS_PRODUCT_CODE, CARGILLS_OUTLET_CODE, CARGILLS_OUTLET_LINE, CARGILLS_QTY,
+                          is_valid_product_name, lowest_qty_candidate, next_match_index, COUNTRY_STYLE_PRODUCT_CODE, COUNTRY_STYLE_OUTLETS, SOFTLOGIC_OUTLET_CODE,
+                          SOFTLOGIC_ITEM_CODE, get_decimal_value, LAUGFS_OUTLET_NAME, LAUGFS_ITEM_CODE, LAUGFS_COLUMN_NAMES,
+                          get_valid_value, ARPICO_ORDER_LINE, is_valid_outlet_name, is_valid_item_code, SUMMARY_OUTLET_CODE,
+                          OTHER_OUTLET_NAME, CARGILLS_FINGERPRINT, COUNTRY_STYLE_FINGERPRINT, SOFTLOGIC_FINGERPRINT,
+                          LAUGFS_FINGERPRINT, ARPICO_FINGERPRINT, SUMMARY_FINGERPRINT, OTHER_FINGERPRINT, CARGILLS_COLUMNS,
+                          COUNTRY_STYLE_COLUMNS, SOFTLOGIC_COLUMNS, LAUGFS_COLUMNS, ARPICO_COLUMNS)
 
 # Replace with your Azure Form Recognizer endpoint and API key
 endpoint = ""
@@ -16,17 +33,57 @@ api_key = ""
 # endpoint = ""
 # api_key  = ""
 
-# Initialize the DocumentAnalysisClient
-client = DocumentAnalysisClient(endpoint=endpoint, credential=AzureKeyCredential(api_key))
+# Shared Azure client: the async one with adaptive polling (PO_OCR_CLIENT=async, see ocr_client.py) or the sync SDK client
+client = make_ocr_client(endpoint, api_key)
 
-def extract_data_from_pdf(file_path):
-    # Open the PDF file in binary mode
-    with open(file_path, "rb") as pdf_file:
-        poller = client.begin_analyze_document("prebuilt-document", document=pdf_file)
-        result = poller.result()
+# Azure model used for every PO
+MODEL_ID = "prebuilt-document"
 
-    # Convert the result to a dictionary
-    result_dict = {"pages": []}
+def kvp_page_number(kvp):
+    # A pair belongs to the page its key (or, failing that, its value) was found on
+    for element in (kvp.key, kvp.value):
+        regions = getattr(element, "bounding_regions", None) if element else None
+        if regions:
+            return regions[0].page_number
+    return None
+
+def group_key_value_pairs(result):
+    by_page = defaultdict(list)
+    for kvp in result.key_value_pairs or []:
+        key = kvp.key.content if kvp.key else None
+        value = kvp.value.content if kvp.value else None
+        by_page[kvp_page_number(kvp)].append({"key": key, "value": value})
+    return by_page
+
+def table_page_number(element):
+    regions = getattr(element, "bounding_regions", None)
+    return regions[0].page_number if regions else None
+
+def group_tables(result):
+    # The SDK reports tables for the whole document (result.tables). Cells are
+    # split by the page they sit on, so a table continued over a page break
+    # shows up as one cell list on each page it touches.
+    by_page = defaultdict(list)
+    for table in getattr(result, "tables", None) or []:
+        table_page = table_page_number(table)
+        cells_by_page = defaultdict(list)
+        for cell in table.cells:
+            cells_by_page[table_page_number(cell) or table_page].append({
+                "row_index": cell.row_index,
+                "column_index": cell.column_index,
+                "content": cell.content
+            })
+        for page_number, cells in cells_by_page.items():
+            by_page[page_number].append(cells)
+    return by_page
+
+def iter_result_pages(result):
+    # Convert the result page by page, so a parser can start on page 1
+    # while later pages are still being converted
+    key_value_pairs = group_key_value_pairs(result)
+    # Pairs without a location are stored once, on the first page of the result
+    unplaced_pairs = key_value_pairs.pop(None, [])
+    tables = group_tables(result)
 
     for page in result.pages:
         page_data = {
@@ -36,89 +93,200 @@ def extract_data_from_pdf(file_path):
             "tables": []  # Initialize the tables key, even if no tables are found
         }
 
-        # Extract lines of text
-        for line in page.lines:
-            page_data["lines"].append({"text": line.content})
-
-        # Extract key-value pairs (with additional check for missing key_value_pairs)
-        if result.key_value_pairs:
-            for kvp in result.key_value_pairs:
-                key = kvp.key.content if kvp.key else None
-                value = kvp.value.content if kvp.value else None
-                page_data["key_value_pairs"].append({"key": key, "value": value})
-
-        # Check if the page has tables
-        if hasattr(page, 'tables') and page.tables:
-            for table in page.tables:
-                table_data = []
-                for cell in table.cells:
-                    table_data.append({
-                        "row_index": cell.row_index,
-                        "column_index": cell.column_index,
-                        "content": cell.content
-                    })
-                page_data["tables"].append(table_data)
-
-        result_dict["pages"].append(page_data)
-    
-    save_folder = "D:\DS_projects\OCR for PO\Json files"
-    
-    # Ensure the save folder exists
-    if not os.path.exists(save_folder):
-        os.makedirs(save_folder)
-
-    # Define the path to save the JSON file
-    output_file = os.path.join(save_folder, "extracted_data.json")
-
-    # Save the result_dict to a JSON file
-    with open(output_file, "w") as json_file:
-        json.dump(result_dict, json_file, indent=4)
-
-    return result_dict
+        # Lines of text as compact Line records (see ocr_lines.py)
+        page_data["lines"] = tuple(Line(line.content, polygon_bbox(getattr(line, "polygon", None))) for line in page.lines)
+
+        # Key-value pairs found on this page only; the SDK reports them for the whole document
+        page_data["key_value_pairs"].extend(unplaced_pairs)
+        unplaced_pairs = []
+        page_data["key_value_pairs"].extend(key_value_pairs.get(page.page_number, []))
+
+        # Tables (cell lists with row_index/column_index/content) found on this page
+        page_data["tables"].extend(tables.get(page.page_number, []))
+
+        yield page_data
+
+def analyze_result_to_dict(result):
+    # Convert the result to a dictionary
+    return {"pages": list(iter_result_pages(result))}
+
+def count_pdf_pages(pdf_bytes):
+    try:
+        return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+    except Exception:
+        # Unreadable locally: let Azure deal with the document in one piece
+        return None
+
+def split_page_ranges(page_count, chunk_pages):
+    # e.g. 23 pages in chunks of 10 -> ["1-10", "11-20", "21-23"]
+    return [
+        "%d-%d" % (first, min(first + chunk_pages - 1, page_count))
+        for first in range(1, page_count + 1, chunk_pages)
+    ]
+
+def split_page_selection(pages, chunk_pages):
+    # A pages= selection in chunks, e.g. "2,3,4,9-11" in chunks of 3 -> ["2-4", "9-11"]
+    numbers = []
+    for part in pages.split(","):
+        first, _, last = part.strip().partition("-")
+        numbers.extend(range(int(first), int(last or first) + 1))
+    selections = []
+    for start in range(0, len(numbers), chunk_pages):
+        runs = []
+        for number in numbers[start:start + chunk_pages]:
+            if runs and number == runs[-1][1] + 1:
+                runs[-1][1] = number
+            else:
+                runs.append([number, number])
+        selections.append(",".join(str(a) if a == b else "%d-%d" % (a, b) for a, b in runs))
+    return selections
+
+def analyze_document(ocr_client, pdf_bytes, **kwargs):
+    # Submit + polling time for one Azure call, recorded as the ocr_wait stage
+    with span("ocr_wait"):
+        return ocr_client.begin_analyze_document(MODEL_ID, document=pdf_bytes, **kwargs).result()
+
+def iter_analyze_results(pdf_bytes, ocr_client, chunk_pages=None, max_workers=None, pages=None):
+    # Long POs are analyzed as page-range chunks submitted concurrently. Results
+    # are yielded in page order as soon as each chunk (and the ones before it) is done;
+    # Azure keeps the original page_number on pages analyzed with pages="a-b".
+    chunk_pages = OCR_CHUNK_PAGES if chunk_pages is None else chunk_pages
+    max_workers = OCR_CHUNK_CONCURRENCY if max_workers is None else max_workers
+
+    if pages is not None:
+        # An explicit page selection (e.g. the scanned pages of a hybrid PDF) is chunked the same way
+        page_ranges = split_page_selection(pages, chunk_pages) if chunk_pages > 0 else [pages]
+        if len(page_ranges) == 1:
+            yield analyze_document(ocr_client, pdf_bytes, pages=pages)
+            return
+    else:
+        page_count = count_pdf_pages(pdf_bytes) if chunk_pages > 0 else None
+        if not page_count or page_count <= chunk_pages:
+            yield analyze_document(ocr_client, pdf_bytes)
+            return
+        page_ranges = split_page_ranges(page_count, chunk_pages)
+
+    def analyze_range(page_range):
+        return analyze_document(ocr_client, pdf_bytes, pages=page_range)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(page_ranges))), thread_name_prefix="po-ocr") as executor:
+        futures = [executor.submit(analyze_range, page_range) for page_range in page_ranges]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def iter_pdf_pages(file_path, ocr_client=None, cache=None, job_id=None, pages=None):
+    # Generator version of extract_data_from_pdf: yields one page dict at a time.
+    # pages (e.g. "3,7") limits the analysis to those pages, like the SDK keyword.
+    # ocr_client lets callers (job workers, tests) supply their own
+    # DocumentAnalysisClient; the module-level client is used otherwise
+    ocr_client = ocr_client or client
+    cache = ocr_cache if cache is None else cache
+
+    # file_path may also be the raw PDF bytes of an upload held in memory
+    if isinstance(file_path, (bytes, bytearray)):
+        pdf_bytes = bytes(file_path)
+    else:
+        # Open the PDF file in binary mode
+        with open(file_path, "rb") as pdf_file:
+            pdf_bytes = pdf_file.read()
+
+    # Re-sent or re-uploaded POs are answered from the local cache without calling Azure
+    cache_key = cache.make_key(pdf_bytes, MODEL_ID if pages is None else "%s#pages=%s" % (MODEL_ID, pages))
+    result_dict = cache.get(cache_key)
+    if cache.enabled:
+        ocr_cache_requests.inc(result="hit" if result_dict is not None else "miss")
+    if result_dict is not None:
+        # Raw results are only dumped when the debug sink is switched on (PO_DEBUG_DUMP)
+        debug_sink.write(job_id, result_dict)
+        # Cached results are stored in the plain dict format
+        for page in result_dict["pages"]:
+            yield compact_page(page)
+        return
+
+    # Pages are only kept around when the cache or the debug sink needs the whole document
+    keep_pages = cache.enabled or debug_sink.enabled
+    kept_pages = []
+    for result in iter_analyze_results(pdf_bytes, ocr_client, pages=pages):
+        for page_data in iter_result_pages(result):
+            if keep_pages:
+                kept_pages.append(page_data)
+            yield page_data
+
+    if keep_pages:
+        result_dict = {"pages": kept_pages}
+        cache.put(cache_key, result_dict)
+        debug_sink.write(job_id, result_dict)
+
+def extract_data_from_pdf(file_path, ocr_client=None, cache=None, job_id=None):
+    return {"pages": list(iter_pdf_pages(file_path, ocr_client=ocr_client, cache=cache, job_id=job_id))}
 
 # Load dimensions from Excel
+def _float_cells(df, column):
+    # float(cell or 0) for a whole column; the mask marks cells where that conversion fails
+    if column not in df:
+        return np.zeros(len(df)), np.zeros(len(df), dtype=bool)
+    values = df[column]
+    if is_numeric_dtype(values):
+        return values.to_numpy(dtype=float, na_value=np.nan), np.zeros(len(df), dtype=bool)
+    # Mixed/text column: only these cells go through float() one by one
+    floats = np.empty(len(df))
+    failed = np.zeros(len(df), dtype=bool)
+    for i, value in enumerate(values.tolist()):
+        try:
+            floats[i] = float(value or 0)
+        except (ValueError, TypeError):
+            floats[i] = 0.0
+            failed[i] = True
+    return floats, failed
+
+def _pack_quantities(df):
+    # int('per box'), or int('per bundle') when 'per box' is empty; 1 when neither converts
+    per_box = df["per box"] if "per box" in df else pd.Series([None] * len(df), index=df.index, dtype=object)
+    per_bundle = df["per bundle"] if "per bundle" in df else pd.Series([None] * len(df), index=df.index, dtype=object)
+    empty_box = per_box.isna().to_numpy() | (per_box.astype(object) == "").to_numpy()
+    chosen = per_box.astype(object).where(~empty_box, per_bundle.astype(object))
+    numeric = pd.to_numeric(chosen, errors="coerce")
+    if not chosen.map(type).isin((str,)).any():
+        # Numbers only: truncate like int(), missing/inf fall back to 1
+        finite = np.isfinite(numeric.to_numpy(dtype=float, na_value=np.nan))
+        return np.where(finite, np.trunc(numeric.to_numpy(dtype=float, na_value=1.0)), 1.0)
+    quantities = np.ones(len(df))
+    for i, value in enumerate(chosen.tolist()):
+        try:
+            quantities[i] = int(value)
+        except (ValueError, TypeError, OverflowError):
+            pass
+    return quantities
+
 def load_product_dimensions(excel_path):
     # Read with the correct header row
     # df = pd.read_excel(excel_path, header=1, sheet_name=2)
     df = pd.read_excel(excel_path)
 
-    product_dimensions = {}
+    # Whole-column version of the old row loop: item names are normalized once,
+    # dimensions and pack sizes are converted per column, and the volume math
+    # runs on NumPy arrays. Same fallbacks: a bad height/width/length zeroes all
+    # three, an empty 'per box' uses 'per bundle', an unusable pack size is 1.
+    items = df["item"].tolist() if "item" in df else [None] * len(df)
+    item_names = [str(item).strip().lower() for item in items]
 
-    for idx, row in df.iterrows():
-        item_name = str(row.get('item')).strip().lower()
+    dimensions = [_float_cells(df, column) for column in ("height", "width", "length")]
+    failed = dimensions[0][1] | dimensions[1][1] | dimensions[2][1]
+    volume_per_pack = np.where(failed, 0.0, dimensions[0][0] * dimensions[1][0] * dimensions[2][0])
+    qty_per_pack = _pack_quantities(df)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_per_unit = np.where(qty_per_pack != 0, volume_per_pack / np.where(qty_per_pack != 0, qty_per_pack, 1), 0.0)
 
+    product_dimensions = {}
+    for item_name, volume in zip(item_names, volume_per_unit.tolist()):
         # Skip if item_name is NaN or empty
         if not item_name or item_name == 'nan':
             continue
-
-        try:
-            height = float(row.get('height', 0) or 0)
-            width = float(row.get('width', 0) or 0)
-            length = float(row.get('length', 0) or 0)
-        except ValueError:
-            height = width = length = 0
-
-        # Quantity per pack (either from 'per box' or 'per bundle')
-        qty_per_pack = row.get('per box')
-        if pd.isna(qty_per_pack) or qty_per_pack == '':
-            qty_per_pack = row.get('per bundle')
-        try:
-            qty_per_pack = int(qty_per_pack)
-        except (ValueError, TypeError):
-            qty_per_pack = 1
-
-        volume_per_pack = height * width * length
-        volume_per_unit = volume_per_pack / qty_per_pack if qty_per_pack else 0
-
-        product_dimensions[item_name] = {
-            "Item Name": item_name,
-            # "Height": height,
-            # "Width": width,
-            # "Length": length,
-            # "QuantityPerPack": qty_per_pack,
-            # "VolumePerPack": volume_per_pack,
-            "VolumePerUnit": volume_per_unit
-        }
+        product_dimensions[item_name] = {"Item Name": item_name, "VolumePerUnit": volume}
 
     return product_dimensions
 
@@ -129,68 +297,43 @@ def load_product_dimensions(excel_path):
 #     if match:
 #         return product_dimensions[match[0]]["VolumePerUnit"]
 
-def normalize(text):
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s]', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-def all_tokens_in(text_a, text_b):
-    # Check if all tokens of text_a exist in text_b
-    tokens_a = set(text_a.split())
-    tokens_b = set(text_b.split())
-    return tokens_a.issubset(tokens_b)
-
 def get_closest_match(description, product_dimensions):
-    description_norm = normalize(description)
-    
-    best_match = None
-    best_score = 0
-    
-    for key in product_dimensions:
-        key_norm = normalize(key)
-
-        # First: check if all tokens from Excel exist in the PDF description
-        if all_tokens_in(key_norm, description_norm):
-            return product_dimensions[key]["VolumePerUnit"]
-        
-        # Fallback: use fuzzy match as backup
-        score = fuzz.token_sort_ratio(description_norm, key_norm)
-        if score > best_score and score >= 70:
-            best_match = key
-    
-    if best_match:
-        return product_dimensions[best_match]["VolumePerUnit"]
-    
-    return None
-
-def create_excel(processed_data, pdf_file_name):
-    df = pd.DataFrame(processed_data)
-    # If you want to only include selected columns:
-    # df = df[['Outlet Code', 'Total Sales']]
-    
-    output_directory = "D:\\DS_projects\\OCR for PO\\Excel files\\"
-    os.makedirs(output_directory, exist_ok=True)
-    output_file = os.path.join(output_directory, f"Total_vol_n_sales_{pdf_file_name}.xlsx")
-    df.to_excel(output_file, index=False)
-    return output_file
+    # Matching runs against a prebuilt index (see matching.MatchIndex) instead of
+    # re-normalizing every catalog key for every line item
+    return get_match_index(product_dimensions).lookup(description)
+
+def resolve_volumes(descriptions, product_dimensions):
+    # Batch version of get_closest_match: every description of a document is
+    # resolved in one pass, NaN/missing volumes come back as 0
+    with span("match"):
+        volumes = get_match_index(product_dimensions).resolve_many(descriptions)
+    for description, volume_per_unit in volumes.items():
+        if volume_per_unit is None or (isinstance(volume_per_unit, float) and math.isnan(volume_per_unit)):
+            volumes[description] = 0
+    return volumes
+
+def accumulate_volumes(pending_volumes, product_dimensions, outlet_volumes):
+    # pending_volumes holds (outlet, quantity, description_key) collected by a parser
+    volumes = resolve_volumes([description for _, _, description in pending_volumes], product_dimensions)
+    for outlet, quantity, description in pending_volumes:
+        outlet_volumes[outlet] += quantity * volumes[description]
+    return volumes
 
 def safe_float_parse(value):
-    cleaned = re.sub(r'[,:\.]+$', '', value.replace(",", "").replace(":", ""))
+    cleaned = TRAILING_PUNCTUATION.sub('', value.replace(",", "").replace(":", ""))
     return float(cleaned)
 
+cargills_log = get_parser_logger("cargills")
+country_style_log = get_parser_logger("country_style")
+softlogic_log = get_parser_logger("softlogic")
+laugfs_log = get_parser_logger("laugfs")
+arpico_log = get_parser_logger("arpico")
+
 ## Extract details based on pdf-----------------------------------------------------------------------------------------------------------------
 
+@register_parser("cargills", CARGILLS_FINGERPRINT, filename_hints=["Cargills"])
 def process_cargils_data(data, product_dimensions):
     outlet_sales = defaultdict(float)
-    # Regex pattern for product codes
-    product_code_pattern = re.compile(r"^[A-Z]{2,3}\d{3,5}$")
-
-    outlet_code_pattern = re.compile(r'^\d{3,4}\b')
-
-    qty_pattern = re.compile(r'^[1-9]\d{0,2}(\.00)?$')
-
-    matched_qty_values = []
 
     # Initialize a dictionary to store outlet-wise product details
     outlet_products = defaultdict(lambda: {"Outlet Name": "", "Products": []})
@@ -198,18 +341,48 @@ def process_cargils_data(data, product_dimensions):
     # Variables to track outlet details
     current_outlet_details = None
 
+    # Product rows from the OCR tables, when Azure found them (see table_rows.py)
+    table_rows = TableRows(CARGILLS_COLUMNS, "code")
+
     # Iterate through the pages and extract the required details
     for page in data["pages"]:
-        lines = page["lines"]
+        lines = page_texts(page)
+        table_rows.load_page(page)
+
+        # One pass per page: index of the next "1234 EX ..." line at or after
+        # each position, so recovery never rescans the rest of the page
+        next_outlet_line = next_match_index(lines, CARGILLS_OUTLET_LINE)
+        lowest_qty_cache = {}
+
+        def recover_from_outlet_line(start, net_value, vat_value, qty):
+            # Product rows end just before the next outlet line: net and VAT sit
+            # 3 and 2 lines above it, the quantity is the lowest plausible qty in
+            # the 20 lines above it. Without an outlet line the values are kept.
+            outlet_line_index = next_outlet_line[min(start, len(lines))]
+            if outlet_line_index is None:
+                return net_value, vat_value, qty
+            if outlet_line_index >= 3:
+                vat_value = lines[outlet_line_index - 2]
+                net_value = lines[outlet_line_index - 3]
+            else:
+                vat_value = net_value = ""
+            if outlet_line_index not in lowest_qty_cache:
+                lowest_qty_cache[outlet_line_index] = lowest_qty_candidate(lines, outlet_line_index)
+            cargills_log.debug(
+                "Recovered from outlet line %d: net %s, vat %s, qty %s",
+                outlet_line_index, net_value, vat_value, lowest_qty_cache[outlet_line_index]
+            )
+            return net_value, vat_value, lowest_qty_cache[outlet_line_index]
+
         for i in range(len(lines)):
-            text = lines[i]["text"]
+            text = lines[i]
 
             if "Cargills" in text and len(text.split()) > 1:
                 supplier=text
 
             # Identify and store outlet details
             if ("EX" in text or "FH" in text or "FC" in text) and len(text.split()) > 1:
-                if outlet_code_pattern.search(text):
+                if CARGILLS_OUTLET_CODE.search(text):
                     # Split into Outlet Code and Outlet Name
                     parts = text.split(" ", 1)
                     outlet_code = parts[0]
@@ -219,8 +392,8 @@ def process_cargils_data(data, product_dimensions):
                 
                 else:
                     outlet_name = text
-                    outlet_code = lines[i - 1]["text"]
-                    print(f"Initial Outlet Code: {outlet_code}")
+                    outlet_code = lines[i - 1]
+                    cargills_log.debug("Initial Outlet Code: %s", outlet_code)
                     # current_outlet_details = {"Outlet Code": outlet_code, "Outlet Name": outlet_name}
                     # print(current_outlet_details)
 
@@ -231,110 +404,53 @@ def process_cargils_data(data, product_dimensions):
 
 
             # Identify product lines
-            if product_code_pattern.match(text):
+            if CARGILLS_PRODUCT_CODE.match(text):
                 try:
                     # Extract product details
                     product_code = text
-                    if lines[i + 1]["text"] == "- -" and lines[i + 2]["text"] == "- - -":
-                        product_name = lines[i + 3]["text"]
-                        pack_size = lines[i + 4]["text"]
-                        qty = lines[i + 6]["text"]
+                    row = table_rows.take(product_code, required=("name", "qty", "net", "vat"))
+                    if row is not None:
+                        product_name, qty, net_value, vat_value = row["name"], row["qty"], row["net"], row["vat"]
+                    elif lines[i + 1] == "- -" and lines[i + 2] == "- - -":
+                        product_name = lines[i + 3]
+                        pack_size = lines[i + 4]
+                        qty = lines[i + 6]
                         # qty = find_valid_qty(lines, i + 6)
-                        net_value = lines[i + 7]["text"]
-                        vat_value = lines[i + 8]["text"]
+                        net_value = lines[i + 7]
+                        vat_value = lines[i + 8]
                     else:
-                        product_name = lines[i + 1]["text"]
-                        pack_size = lines[i + 2]["text"]
-                        qty = lines[i + 4]["text"]
+                        product_name = lines[i + 1]
+                        pack_size = lines[i + 2]
+                        qty = lines[i + 4]
                         # qty = find_valid_qty(lines, i + 4)
-                        net_value = lines[i + 5]["text"]
-                        vat_value = lines[i + 6]["text"]
+                        net_value = lines[i + 5]
+                        vat_value = lines[i + 6]
 
                     # IF product name is not valid, this logic works
-                    # Check product name validity
-                    def is_valid_product_name(name):
-                        return len(name.split()) >= 2 and any(c.isalpha() for c in name)
-
-                    if not is_valid_product_name(product_name):
+                    if row is None and not is_valid_product_name(product_name):
                         # Fallback: Search nearby for valid product name
                         search_range = 5
-                        found = False
                         for offset in range(1, search_range + 1):
                             # Look below
                             if i + offset < len(lines):
-                                name_candidate = lines[i + offset]["text"]
+                                name_candidate = lines[i + offset]
                                 if is_valid_product_name(name_candidate):
                                     product_name = name_candidate
-                                    found = True
                                     break
 
                             # Look above
                             if i - offset >= 0:
-                                name_candidate = lines[i - offset]["text"]
+                                name_candidate = lines[i - offset]
                                 if is_valid_product_name(name_candidate):
                                     product_name = name_candidate
-                                    found = True
                                     break
 
-                        # Search forward for next outlet code line
-                        for j in range(i + offset + 1, len(lines)):
-                            outlet_code_pattern = re.compile(r'^\d{3,4}\s+(EX|FH|FC)\s+.+')
-                            if outlet_code_pattern.search(lines[j]["text"]):
-                                outlet_line_index = j
-                                break
-
-                        # Extract based on outlet line index
-                        if 'outlet_line_index' in locals():
-                            outlet_code = lines[outlet_line_index]["text"]
-                            try:
-                                vat_value = lines[outlet_line_index - 2]["text"]
-                                net_value = lines[outlet_line_index - 3]["text"]
-                            except IndexError:
-                                # Handle case where lines are not available
-                                vat_value = net_value = qty = cost = pack_size = ""
-
-                        
-                        qty = None
-
-                        for k in range(outlet_line_index - 1, max(outlet_line_index - 21, -1), -1):
-                            candidate = lines[k]["text"].strip()
-                            print(f"Checking candidate for qty: '{candidate}'")  # debug
-                            if qty_pattern.match(candidate):
-                                print(f"Matched quantity: {candidate}")
-                                matched_qty_values.append(float(candidate.replace('.00', '')))
-                                lowest_qty = min(matched_qty_values)
-                                qty = f"{int(lowest_qty)}.00" 
+                        # Re-anchor on the next outlet code line after the name search window
+                        net_value, vat_value, qty = recover_from_outlet_line(i + offset + 1, net_value, vat_value, None)
 
                     # Checking for qunatity value is correct 
-                    if not qty_pattern.match(qty):
-                        # Search forward for next outlet code line
-                        for j in range(i + 1, len(lines)):
-                            outlet_code_pattern = re.compile(r'^\d{3,4}\s+(EX|FH|FC)\s+.+')
-                            if outlet_code_pattern.search(lines[j]["text"]):
-                                outlet_line_index = j
-                                break
-
-                        # Extract based on outlet line index
-                        if 'outlet_line_index' in locals():
-                            outlet_code = lines[outlet_line_index]["text"]
-                            try:
-                                vat_value = lines[outlet_line_index - 2]["text"]
-                                net_value = lines[outlet_line_index - 3]["text"]
-                            except IndexError:
-                                # Handle case where lines are not available
-                                vat_value = net_value = qty = cost = pack_size = ""
-                        
-                        # To detect qty value
-                        qty = None
-
-                        for k in range(outlet_line_index - 1, max(outlet_line_index - 21, -1), -1):
-                            candidate = lines[k]["text"].strip()
-                            print(f"Checking candidate for qty: '{candidate}'")  # debug
-                            if qty_pattern.match(candidate):
-                                print(f"Matched quantity: {candidate}")
-                                matched_qty_values.append(float(candidate.replace('.00', '')))
-                                lowest_qty = min(matched_qty_values)
-                                qty = f"{int(lowest_qty)}.00"
+                    if qty is None or not CARGILLS_QTY.match(qty):
+                        net_value, vat_value, qty = recover_from_outlet_line(i + 1, net_value, vat_value, qty)
 
                     if current_outlet_details:
                         try:
@@ -372,6 +488,7 @@ def process_cargils_data(data, product_dimensions):
         })
     return output_list
 
+@register_parser("country_style", COUNTRY_STYLE_FINGERPRINT, filenames=["country style.pdf"])
 def process_country_style_data(data, product_dimensions):
         def safe_float(value):
             try:
@@ -379,52 +496,58 @@ def process_country_style_data(data, product_dimensions):
             except:
                 return 0.0
             
-        # Regex pattern for product codes
-        product_code_pattern = re.compile(r"^\d{4,6}$")
         outlet_sales = defaultdict(float)
 
         # Initialize a dictionary to store all product details by outlet
         outlet_products = defaultdict(lambda: defaultdict(lambda: {'name': '', 'quantity': 0.0}))
 
+        table_rows = TableRows(COUNTRY_STYLE_COLUMNS, "code")
+
         # Iterate through the pages and extract the required details
         for page in data["pages"]:
-            lines = page["lines"]
+            lines = page_texts(page)
+            table_rows.load_page(page)
             for i in range(len(lines)):
-                text = lines[i]["text"]
+                text = lines[i]
 
                 if "PDK" in text and len(text.split()) > 1:
                     supplier = text
                 
                 # Identify product lines
-                if product_code_pattern.match(text):
+                if COUNTRY_STYLE_PRODUCT_CODE.match(text):
                     try:
                         # Extract product details
                         product_code = text
-                        product_name = lines[i + 1]["text"]
-                        CPrice = lines[i + 2]["text"]
-                        
-                        # Set default price if it's not a number
-                        if not CPrice.isdigit():
-                            print(f"Price is not a digit")
-                            price = safe_float(lines[i + 4]["text"])
-                            bg = safe_float(lines[i + 5]["text"])
-                            kl = safe_float(lines[i + 6]["text"])
-                            kw = safe_float(lines[i + 7]["text"])
-                            ne = safe_float(lines[i + 8]["text"])
-                            pl = safe_float(lines[i + 9]["text"])
-                            tr = safe_float(lines[i + 10]["text"])
+                        row = table_rows.take(product_code, required=("name", "price"))
+                        if row is not None:
+                            # Empty outlet cells are no order, as with the line path's safe_float
+                            product_name = row["name"]
+                            price = safe_float(row["price"])
+                            bg, kl, kw, ne, pl, tr = (safe_float(row.get(outlet, "")) for outlet in COUNTRY_STYLE_OUTLETS)
+                        elif not lines[i + 2].isdigit():
+                            # Set default price if it's not a number
+                            product_name = lines[i + 1]
+                            country_style_log.debug("Price is not a digit")
+                            price = safe_float(lines[i + 4])
+                            bg = safe_float(lines[i + 5])
+                            kl = safe_float(lines[i + 6])
+                            kw = safe_float(lines[i + 7])
+                            ne = safe_float(lines[i + 8])
+                            pl = safe_float(lines[i + 9])
+                            tr = safe_float(lines[i + 10])
                         else:
-                            print(f"Price is a digit")
-                            price = safe_float(lines[i + 3]["text"])
-                            bg = safe_float(lines[i + 4]["text"])
-                            kl = safe_float(lines[i + 5]["text"])
-                            kw = safe_float(lines[i + 6]["text"])
-                            ne = safe_float(lines[i + 7]["text"])
-                            pl = safe_float(lines[i + 8]["text"])
-                            tr = safe_float(lines[i + 9]["text"])
+                            country_style_log.debug("Price is a digit")
+                            product_name = lines[i + 1]
+                            price = safe_float(lines[i + 3])
+                            bg = safe_float(lines[i + 4])
+                            kl = safe_float(lines[i + 5])
+                            kw = safe_float(lines[i + 6])
+                            ne = safe_float(lines[i + 7])
+                            pl = safe_float(lines[i + 8])
+                            tr = safe_float(lines[i + 9])
                         
 
-                        for outlet, qty in zip(['BG', 'KL', 'KW', 'NE', 'PL', 'TR'], [bg, kl, kw, ne, pl, tr]):
+                        for outlet, qty in zip(COUNTRY_STYLE_OUTLETS, [bg, kl, kw, ne, pl, tr]):
                             outlet_products[outlet][product_code]['name'] = product_name
                             outlet_products[outlet][product_code]['quantity'] += qty
                             outlet_products[outlet][product_code]['price'] = price
@@ -432,14 +555,18 @@ def process_country_style_data(data, product_dimensions):
                             # Do not multiply with C/S
                             outlet_sales[outlet] += qty * price
 
-                        print(f"Product Code: {product_code}, Product Name: {product_name}, Price: {price}, BG: {bg}, KL: {kl}, KW: {kw}, NE: {ne}, PL: {pl}, TR: {tr}")
+                        country_style_log.debug(
+                            "Product Code: %s, Product Name: %s, Price: %s, BG: %s, KL: %s, KW: %s, NE: %s, PL: %s, TR: %s",
+                            product_code, product_name, price, bg, kl, kw, ne, pl, tr
+                        )
 
                     except IndexError:
                         continue
 
         # Create a structured output for outlet products
         outlet_summary = []
-        print(outlet_products)
+        if country_style_log.isEnabledFor(logging.DEBUG):
+            country_style_log.debug("Outlet products: %s", {outlet: dict(products) for outlet, products in outlet_products.items()})
 
         for outlet, products in outlet_products.items():
             outlet_data = {
@@ -460,6 +587,7 @@ def process_country_style_data(data, product_dimensions):
         # Directly return the outlet_summary list with jsonify
         return outlet_summary
 
+@register_parser("softlogic", SOFTLOGIC_FINGERPRINT, filename_hints=["Softlogic"])
 def process_Softlogic_data(data, product_dimensions):
         # Initialize a dictionary to store outlet-wise product details
         outlet_products = defaultdict(list)
@@ -469,57 +597,56 @@ def process_Softlogic_data(data, product_dimensions):
         current_outlet_code = None
         current_outlet_name = None
 
-        # Helper function to validate and adjust line for decimal values
-        def get_decimal_value(lines, start_index, max_index):
-            index = start_index
-            while index < max_index:
-                value = lines[index]["text"].strip()
-                if re.match(r"^\d+(\.\d+)?$", value):  # Check if the value is a decimal number
-                    return value, index
-                index += 1
-            return None, start_index  # Fallback to original index if no valid value is found
+        table_rows = TableRows(SOFTLOGIC_COLUMNS, "code")
 
         # Iterate through the pages and extract the required details
         for page in data["pages"]:
-            lines = page["lines"]
+            lines = page_texts(page)
+            table_rows.load_page(page)
             for i in range(len(lines)):
-                text = lines[i]["text"].strip()
+                text = lines[i]
 
                 if "Softlogic" in text and len(text.split()) > 1:
                     supplier = text
 
                 # Identify and store outlet code and name
-                if re.match(r"^\d{5}$", text):  # Matches exactly 5-digit numeric codes
+                if SOFTLOGIC_OUTLET_CODE.match(text):
                     try:
                         current_outlet_code = text  # The 5-digit outlet code
-                        current_outlet_name = lines[i + 1]["text"].strip()  # The next line contains the outlet name
+                        current_outlet_name = lines[i + 1]  # The next line contains the outlet name
                     except IndexError:
                         current_outlet_code = None
                         current_outlet_name = None
 
                 # Identify product lines
-                if re.match(r"^\d{6}$", text):  # Matches 6-digit item codes
+                if SOFTLOGIC_ITEM_CODE.match(text):
                     try:
                         # Extract product details
                         item_code = text
-                        item_description = lines[i + 1]["text"].strip()
                         sale = 0
 
-                        # Validate and adjust 'Price'
-                        price, price_index = get_decimal_value(lines, i + 2, len(lines))
+                        row = table_rows.take(item_code, required=("name", "price", "vat", "qty"))
+                        if row is not None:
+                            item_description = row["name"]
+                            price, vat_value, order_in_quantity = row["price"], row["vat"], row["qty"]
+                        else:
+                            item_description = lines[i + 1]
+
+                            # Validate and adjust 'Price'
+                            price, price_index = get_decimal_value(lines, i + 2, len(lines))
 
-                        vat_value = get_decimal_value(lines, price_index + 1, len(lines))
+                            vat_value, _ = get_decimal_value(lines, price_index + 1, len(lines))
 
-                        # Validate and adjust 'Order in Quantity'
-                        order_in_quantity, _ = get_decimal_value(lines, price_index + 5, len(lines))
+                            # Validate and adjust 'Order in Quantity'
+                            order_in_quantity, _ = get_decimal_value(lines, price_index + 5, len(lines))
 
-                        print(f"Item Code: {item_code}, Price: {price}, Order in Quantity: {order_in_quantity}")
+                        softlogic_log.debug("Item Code: %s, Price: %s, Order in Quantity: %s", item_code, price, order_in_quantity)
 
                         # Add product details to the outlet's list
                         if current_outlet_code and current_outlet_name:
                             order_in_quantity = safe_float_parse(order_in_quantity)
                             price = safe_float_parse(price)
-                            vat_value = safe_float_parse(vat_value[0])
+                            vat_value = safe_float_parse(vat_value)
 
                             sale = order_in_quantity * price * (vat_value + 100) / 100
 
@@ -551,60 +678,56 @@ def process_Softlogic_data(data, product_dimensions):
         # outlet_products_json = json.dumps(structured_output, indent=4, sort_keys=False)
 
         # return jsonify(json.loads(outlet_products_json))
-        print(structured_output)
+        softlogic_log.debug("Structured output: %s", structured_output)
         return structured_output
 
+@register_parser("laugfs", LAUGFS_FINGERPRINT, filename_hints=["Laugfs P"])
 def process_Laugfs_data(data, product_dimensions):
 
         # Initialize a dictionary to store outlet-wise product details
         outlet_products = defaultdict(list)
         outlet_sales = defaultdict(float)
         outlet_volumes = defaultdict(float)
+        pending_volumes = []
 
         # Variable to track the current outlet name
         current_outlet_name = None
 
-        column_names = {"Code", "Item Name", "Cost Price", "VAT Cost Price", "Quantity", "Qty", "CostPrice", "Vat Cost Price", "Vat"}
+        table_rows = TableRows(LAUGFS_COLUMNS, "code")
 
         # Iterate through the pages and extract the required details
         for page in data["pages"]:
-            lines = page["lines"]
+            lines = page_texts(page)
+            table_rows.load_page(page)
             for i in range(len(lines)):
-                text = lines[i]["text"].strip()
+                text = lines[i]
 
                 if "Laugfs" in text and len(text.split()) > 1:
                     supplier=text
 
                 # Identify and store outlet name (assumes outlet name has first letter uppercase and others lowercase)
-                if re.match(r"^[A-Z][a-z]+(\s[A-Z][a-z]+)*$", text) and text not in column_names:
+                if LAUGFS_OUTLET_NAME.match(text) and text not in LAUGFS_COLUMN_NAMES:
                     current_outlet_name = text
 
                 # Identify product lines (4 to 7 digit item codes)
-                if re.match(r"^\d{4,7}$", text):
+                if LAUGFS_ITEM_CODE.match(text):
                     try:
                         # Extract product details with dynamic adjustment for missing data
                         item_code = text
 
-                        # Helper function to get the next valid value
-                        def get_valid_value(start_index, max_index):
-                            index = start_index
-                            while index < max_index and lines[index]["text"].strip() == "-":
-                                index += 1
-                            return lines[index]["text"].strip(), index
-
-                        item_name, item_name_index = get_valid_value(i + 1, len(lines))
-                        cost_price, cost_price_index = get_valid_value(item_name_index + 1, len(lines))
-                        vat_cost_price, vat_cost_price_index = get_valid_value(cost_price_index + 2, len(lines))
-                        quantity, _ = get_valid_value(vat_cost_price_index + 1, len(lines))
+                        row = table_rows.take(item_code, required=("name", "vat_cost", "qty"))
+                        if row is not None:
+                            item_name, vat_cost_price, quantity = row["name"], row["vat_cost"], row["qty"]
+                        else:
+                            item_name, item_name_index = get_valid_value(lines, i + 1, len(lines))
+                            cost_price, cost_price_index = get_valid_value(lines, item_name_index + 1, len(lines))
+                            vat_cost_price, vat_cost_price_index = get_valid_value(lines, cost_price_index + 2, len(lines))
+                            quantity, _ = get_valid_value(lines, vat_cost_price_index + 1, len(lines))
 
-                        print(f"Item Code: {item_code}, VAT Cost Price: {vat_cost_price}, Quantity: {quantity}")
+                        laugfs_log.debug("Item Code: %s, VAT Cost Price: %s, Quantity: %s", item_code, vat_cost_price, quantity)
 
                         # Normalize description for matching
                         description_key = item_name.lower()
-                        volume_per_unit = get_closest_match(description_key, product_dimensions)
-                        if volume_per_unit is None or (isinstance(volume_per_unit, float) and math.isnan(volume_per_unit)):
-                            volume_per_unit = 0
-                        print(f"Volume per unit for {description_key}: {volume_per_unit}")
 
                         try:
                             quantity = safe_float_parse(quantity)
@@ -639,10 +762,16 @@ def process_Laugfs_data(data, product_dimensions):
                             })
                         
                         outlet_sales[current_outlet_name] += total_sales
-                        # outlet_volumes[current_outlet_name] += total_volume
+                        # Volumes are resolved for the whole document after the loop
+                        pending_volumes.append((current_outlet_name, quantity, description_key))
                     except IndexError:
                         continue
 
+        volumes = accumulate_volumes(pending_volumes, product_dimensions, outlet_volumes)
+        if laugfs_log.isEnabledFor(logging.DEBUG):
+            for description_key, volume_per_unit in volumes.items():
+                laugfs_log.debug("Volume per unit for %s: %s", description_key, volume_per_unit)
+
         structured_output = []
 
         for (current_outlet_name), products in outlet_products.items():
@@ -656,41 +785,38 @@ def process_Laugfs_data(data, product_dimensions):
 
         return structured_output
 
+@register_parser("arpico", ARPICO_FINGERPRINT, filename_hints=["Arpico"])
 def process_Arpico_data(data, product_dimensions):
 
             # Initialize a dictionary to store outlet-wise product details
             outlet_products = defaultdict(list)
             outlet_totals = defaultdict(float)
             outlet_volumes = defaultdict(float)
+            pending_volumes = []
 
             # Variable to track the current outlet name
             current_outlet_name = None
 
-            # Function to check if a name ends with SS, SC, or Daily
-            def is_valid_outlet_name(name):
-                return name.endswith("SS") or name.endswith("SC") or name.endswith("Daily")
-
-            # Regular expression to check for valid item codes (starting with 4 capital letters)
-            def is_valid_item_code(code):
-                return bool(re.match(r"^[A-Z]{4}\d{5,10}$", code))  # 4 letters followed by 5-10 digits
-
             # Initialize a set to store unique outlet names
             unique_outlet_names = set()
             next_outlet_code = None
             outlet_codes = {}
 
+            table_rows = TableRows(ARPICO_COLUMNS, "code")
+
             # Iterate through the pages and extract the required details
             for page in data["pages"]:
-                lines = page["lines"]
+                lines = page_texts(page)
+                table_rows.load_page(page)
                 for i in range(len(lines)):
-                    text = lines[i]["text"].strip()
+                    text = lines[i]
 
                     if "Arpico" in text and len(text.split()) > 1:
                         supplier=text
 
                     # Capture code after 'Supply' and store for next outlet
                     if text.lower() == "supply" and i + 1 < len(lines):
-                        next_outlet_code = lines[i + 1]["text"].strip()
+                        next_outlet_code = lines[i + 1]
 
                     # When outlet name appears, map the code stored from earlier
                     if is_valid_outlet_name(text):
@@ -710,7 +836,7 @@ def process_Arpico_data(data, product_dimensions):
 
                     # Extract total sales amount from line after "Total"
                     if text.strip().lower() == "total" and i + 1 < len(lines):
-                        amount_text = lines[i + 1]["text"].strip().replace(",", "")
+                        amount_text = lines[i + 1].replace(",", "")
                         try:
                             amount = float(amount_text)
                             if current_outlet_name:
@@ -721,7 +847,7 @@ def process_Arpico_data(data, product_dimensions):
                             pass  # skip if not a valid float
 
                     # Identify product lines (using Order No, PLU, Item Code, Description, Rate, and Ordered)
-                    if re.match(r"^\d{8,11}$|^\d{8,11} \d{5,6}$|^\d{8,11} \d{5,6} [A-Z]{4}\d{5,10}$", text):  # Checking for a numeric Order No
+                    if ARPICO_ORDER_LINE.match(text):  # Checking for a numeric Order No
                         try:
                             order_no = text.strip()
                             order_no_parts = order_no.split()
@@ -730,52 +856,54 @@ def process_Arpico_data(data, product_dimensions):
                                 order_no= order_no_parts[0]
                                 plu = order_no_parts[1]
                                 item_code = order_no_parts[2]
-                                description = lines[i + 1]["text"].strip()
-                                rate = lines[i + 4]["text"].strip()
-                                vat = lines[i + 6]["text"].strip()
-                                ordered = lines[i + 7]["text"].strip()
+                                description = lines[i + 1]
+                                rate = lines[i + 4]
+                                vat = lines[i + 6]
+                                ordered = lines[i + 7]
 
                             elif len(order_no_parts)==2:
                                 order_no= order_no_parts[0]
                                 plu = order_no_parts[1]
-                                item_code = lines[i + 1]["text"].strip()
-                                description = lines[i + 2]["text"].strip()
-                                rate = lines[i + 5]["text"].strip()
-                                vat = lines[i + 7]["text"].strip()
-                                ordered = lines[i + 8]["text"].strip()
+                                item_code = lines[i + 1]
+                                description = lines[i + 2]
+                                rate = lines[i + 5]
+                                vat = lines[i + 7]
+                                ordered = lines[i + 8]
                             
                             else:
-                                plu_item_code = lines[i + 1]["text"].strip()
+                                plu_item_code = lines[i + 1]
                             
                                 # Split the PLU and Item Code if they are together
                                 plu_parts = plu_item_code.split()
                                 if len(plu_parts) == 2:  # PLU and Item Code are separated by space
                                     plu = plu_parts[0]
                                     item_code = plu_parts[1]
-                                    description = lines[i + 2]["text"].strip()
-                                    rate = lines[i + 5]["text"].strip()
-                                    vat = lines[i + 7]["text"].strip()
-                                    ordered = lines[i + 8]["text"].strip()
+                                    description = lines[i + 2]
+                                    rate = lines[i + 5]
+                                    vat = lines[i + 7]
+                                    ordered = lines[i + 8]
 
                                 else:
                                     # If PLU and Item Code are in separate fields, assign them accordingly
                                     plu = plu_item_code
-                                    item_code = lines[i + 2]["text"].strip()
-                                    description = lines[i + 3]["text"].strip()
-                                    rate = lines[i + 6]["text"].strip()
-                                    vat = lines[i + 8]["text"].strip()
-                                    ordered = lines[i + 9]["text"].strip()
+                                    item_code = lines[i + 2]
+                                    description = lines[i + 3]
+                                    rate = lines[i + 6]
+                                    vat = lines[i + 8]
+                                    ordered = lines[i + 9]
                             
 
+                            # The table row, when there is one, replaces the offset reads above
+                            row = table_rows.take(item_code, required=("name", "rate", "vat", "qty"))
+                            if row is not None:
+                                description, rate, vat, ordered = row["name"], row["rate"], row["vat"], row["qty"]
+
                             # Normalize description for matching
                             description_key = description.lower()
-                            volume_per_unit = get_closest_match(description_key, product_dimensions)
-                            if volume_per_unit is None or (isinstance(volume_per_unit, float) and math.isnan(volume_per_unit)):
-                                volume_per_unit = 0
-                            # print(f"Volume per unit for {description_key}: {volume_per_unit}")
 
                             # Validate item code (starting with 4 capital letters followed by digits)
                             if not is_valid_item_code(item_code):
+                                arpico_log.debug("Skipping order line %s with item code %r", order_no, item_code)
                                 continue  # Skip this item if it doesn't match the pattern
 
                             try:
@@ -784,7 +912,6 @@ def process_Arpico_data(data, product_dimensions):
                                 quantity = 0
 
                             if current_outlet_name:
-                                total_volume = quantity * (volume_per_unit or 0)
                                 try:
                                     rate_val = safe_float_parse(rate)
                                     vat_val = safe_float_parse(vat)
@@ -801,7 +928,6 @@ def process_Arpico_data(data, product_dimensions):
                                     "Quantity": ordered,
                                 })
                             else:
-                                total_volume = quantity * (volume_per_unit or 0)
                                 try:
                                     rate_val = safe_float_parse(rate)
                                     vat_val = safe_float_parse(vat)
@@ -819,11 +945,14 @@ def process_Arpico_data(data, product_dimensions):
                                     "Quantity": ordered,
                                 })
                             
-                            outlet_volumes[current_outlet_name] += total_volume
+                            # Volumes are resolved for the whole document after the loop
+                            pending_volumes.append((current_outlet_name, quantity, description_key))
                             outlet_totals[current_outlet_name] += total_sales
                         except IndexError:
                             continue
 
+            accumulate_volumes(pending_volumes, product_dimensions, outlet_volumes)
+
             structured_output = []
 
             for (current_outlet_name), products in outlet_products.items():
@@ -843,45 +972,44 @@ def process_Arpico_data(data, product_dimensions):
 
             return structured_output
 
+# Summary orders carry no volume work, so this parser never loads the dimension table
+@register_parser("cargills_summary", SUMMARY_FINGERPRINT, filename_hints=["Cargills Summary"], needs_dimensions=False,
+                 priority=1, chain="cargills")
 def process_summary_order_data(data):
     outlet_sales = defaultdict(float)
     outlet_info = {}
 
-    # Regex pattern for 4-digit outlet code
-    outlet_code_pattern = re.compile(r"^\d{4}$")
-
-    # Flatten all lines into a single list of texts
-    all_texts = []
-    for page in data["pages"]:
-        for line in page["lines"]:
-            text = line.get("text", "").strip()
-            if text:
-                all_texts.append(text)
-
-    i = 0
-    while i < len(all_texts) - 6:  # Minimum 7 fields per order
-        if outlet_code_pattern.fullmatch(all_texts[i]):
-            try:
-                outlet_code = all_texts[i]
-                outlet_name = all_texts[i + 1]
-                order_no = all_texts[i + 2]
-                order_date = all_texts[i + 3]
-                net_value = all_texts[i + 4]
-                vat_value = all_texts[i + 5]
-                gross_value = all_texts[i + 6]
-
-                net_val = safe_float_parse(net_value)
-                vat_val = safe_float_parse(vat_value)
-                gross_val = safe_float_parse(gross_value)
-
-                outlet_sales[outlet_code] += gross_val
-                outlet_info[outlet_code] = outlet_name
-
-                i += 7
-            except IndexError:
+    # Walk the non-empty texts of all pages with a 7-field window instead of
+    # flattening the whole document first, so pages can be streamed in
+    def iter_texts():
+        for page in data["pages"]:
+            for text in page_texts(page):
+                if text:
+                    yield text
+
+    texts = iter_texts()
+    window = deque()
+    while True:
+        while len(window) < 7:  # Minimum 7 fields per order
+            text = next(texts, None)
+            if text is None:
                 break
+            window.append(text)
+        if len(window) < 7:
+            break
+
+        if SUMMARY_OUTLET_CODE.fullmatch(window[0]):
+            outlet_code, outlet_name, order_no, order_date, net_value, vat_value, gross_value = window
+            window.clear()
+
+            net_val = safe_float_parse(net_value)
+            vat_val = safe_float_parse(vat_value)
+            gross_val = safe_float_parse(gross_value)
+
+            outlet_sales[outlet_code] += gross_val
+            outlet_info[outlet_code] = outlet_name
         else:
-            i += 1
+            window.popleft()
 
     # Prepare final formatted output
     output_list = []
@@ -898,23 +1026,25 @@ def process_summary_order_data(data):
 
     return output_list
 
+@register_parser("other", OTHER_FINGERPRINT, fallback=True)
 def process_other_data(data, product_dimensions):
     outlet_products = defaultdict(list)
     product_sales = defaultdict(float)
     outlet_sales = defaultdict(float)
     outlet_volumes = defaultdict(float)
+    pending_volumes = []
 
     for page in data["pages"]:
-        lines = page["lines"]
+        lines = page_texts(page)
         outlet_names = []
 
         for i in range(len(lines)):
-            text = lines[i]["text"]
-            if re.match(r"^[A-Z]{3,4}\d?$", text):
+            text = lines[i]
+            if OTHER_OUTLET_NAME.match(text):
                 outlet_names.append(text)
 
         for i in range(len(lines)):
-            text = lines[i]["text"]
+            text = lines[i]
 
             if "Country" in text and len(text.split()) > 1:
                 supplier = text.replace(":", "").strip()
@@ -922,27 +1052,23 @@ def process_other_data(data, product_dimensions):
             if text.startswith("*"):
                 try:
                     item_code = text.replace('*', '').strip()
-                    item_description = lines[i + 1]["text"].strip()
-                    price_text = lines[i + 2]["text"]
+                    item_description = lines[i + 1]
+                    price_text = lines[i + 2]
                     price = float(price_text.replace(",", "").strip())
-                    case = int(lines[i + 3]["text"])
-                    outlet_cases = [int(lines[i + j]["text"]) * case for j in range(4, 14, 2)]
+                    case = int(lines[i + 3])
+                    outlet_cases = [int(lines[i + j]) * case for j in range(4, 14, 2)]
 
                     # Normalize description for matching
                     description_key = item_description.lower()
-                    volume_per_unit = get_closest_match(description_key, product_dimensions)
-                    if volume_per_unit is None or (isinstance(volume_per_unit, float) and math.isnan(volume_per_unit)):
-                        volume_per_unit = 0
-                    # print(f"Volume per unit for {description_key}: {volume_per_unit}")
 
                     for j, outlet_name in enumerate(outlet_names):
                         quantity = outlet_cases[j]
                         total_sales = quantity * price
-                        total_volume = quantity * (volume_per_unit or 0)
 
                         product_sales[item_code] += total_sales
                         outlet_sales[outlet_name] += total_sales
-                        outlet_volumes[outlet_name] += total_volume
+                        # Volumes are resolved for the whole document after the loop
+                        pending_volumes.append((outlet_name, quantity, description_key))
 
                         outlet_products[outlet_name].append({
                             "Code": item_code,
@@ -957,6 +1083,8 @@ def process_other_data(data, product_dimensions):
                 except (IndexError, ValueError):
                     continue
 
+    accumulate_volumes(pending_volumes, product_dimensions, outlet_volumes)
+
     output_list = []
     for outlet, products in outlet_products.items():
         outlet_details = {
@@ -971,3 +1099,14 @@ def process_other_data(data, product_dimensions):
     return {
         "Outlet Details": output_list
     }
+
+## Parser selection-------------------------------------------------------------------------------------------------------------------------------
+
+# Every process_* function walks data["pages"] exactly once, so "pages" may be
+# a generator (see iter_pdf_pages) as well as a list.
+
+def process_document(extracted_data, file_name, get_product_dimensions):
+    # The parser is picked from page 1's content (see registry.py); the file name
+    # is only a fallback. get_product_dimensions is only called for parsers
+    # that need the dimension table.
+    return run_parser(extracted_data, file_name, get_product_dimensions)